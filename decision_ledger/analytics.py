@@ -0,0 +1,89 @@
+import frappe
+from frappe.utils import getdate, add_months
+
+# Decision counts are pre-aggregated into `Decision Rollup`, one row per
+# (project, month, area, status, impact type). Only non-cancelled decisions count;
+# the month bucket is taken from `creation` so it never moves after insert.
+
+
+def month_start(value):
+    return getdate(value).replace(day=1)
+
+
+def refresh_rollup(project: str, month):
+    """Recompute every rollup row for one (project, month) bucket."""
+    if not project:
+        return
+    start = month_start(month)
+    end = add_months(start, 1)
+
+    frappe.db.delete("Decision Rollup", {"project": project, "month": start})
+    rows = frappe.db.sql("""
+        SELECT decision_area, decision_status, decision_impact_type, COUNT(*) AS decision_count
+        FROM `tabDecision Ledger`
+        WHERE project=%(project)s AND docstatus < 2
+          AND creation >= %(start)s AND creation < %(end)s
+        GROUP BY decision_area, decision_status, decision_impact_type
+    """, {"project": project, "start": start, "end": end}, as_dict=True)
+
+    if not rows:
+        return
+    now, user = frappe.utils.now(), frappe.session.user
+    frappe.db.bulk_insert(
+        "Decision Rollup",
+        fields=["name", "creation", "modified", "owner", "modified_by", "project", "month",
+                "decision_area", "decision_status", "decision_impact_type", "decision_count"],
+        values=[
+            (frappe.generate_hash(length=12), now, now, user, user, project, start,
+             r.decision_area, r.decision_status, r.decision_impact_type, r.decision_count)
+            for r in rows
+        ],
+    )
+
+
+def on_decision_change(doc):
+    """Refresh the buckets a Decision Ledger change can affect (old and new project)."""
+    month = month_start(doc.creation)
+    refresh_rollup(doc.project, month)
+    before = doc.get_doc_before_save()
+    if before and before.project and before.project != doc.project:
+        refresh_rollup(before.project, month)
+
+
+def rebuild_rollups():
+    """Full rebuild, for backfills and manual repair."""
+    frappe.db.delete("Decision Rollup")
+    buckets = frappe.db.sql("""
+        SELECT DISTINCT project, DATE_FORMAT(creation, '%%Y-%%m-01') AS month
+        FROM `tabDecision Ledger`
+        WHERE docstatus < 2 AND IFNULL(project, '') != ''
+    """, as_dict=True)
+    for b in buckets:
+        refresh_rollup(b.project, b.month)
+    frappe.db.commit()
+
+
+def get_rollups(project: str | None = None, from_date=None, to_date=None,
+                decision_area: str | None = None, decision_impact_type: str | None = None):
+    filters = {}
+    if project:
+        filters["project"] = project
+    if decision_area:
+        filters["decision_area"] = decision_area
+    if decision_impact_type:
+        filters["decision_impact_type"] = decision_impact_type
+    if from_date and to_date:
+        filters["month"] = ["between", [month_start(from_date), getdate(to_date)]]
+    elif from_date:
+        filters["month"] = [">=", month_start(from_date)]
+    elif to_date:
+        filters["month"] = ["<=", getdate(to_date)]
+
+    return frappe.get_all(
+        "Decision Rollup",
+        filters=filters,
+        fields=["project", "month", "decision_area", "decision_status",
+                "decision_impact_type", "decision_count"],
+        order_by="month asc, project asc",
+        limit_page_length=0,
+    )
@@ -2,7 +2,13 @@ import frappe
 from frappe.utils import nowdate, cstr, flt, cint
 from .todo_digest import format_todo_markdown, format_todo_summary_markdown
 from .todo_bot_tasks import send_full_digest_to_user, send_summary_to_user
-from .raven_utils import raven_available
+from .delivery import deliver, delivery_available
+from . import similarity, analytics, lineage
+from .masters import get_all_masters
+from .replica import replica_read, replica_status
+from .forecast import get_forecasts
+from . import workload, snapshots
+from .project_access import allowed_projects, check_project_access, filter_projects
 
 RAVEN_UNAVAILABLE_MSG = "Raven is not installed; ToDo digest was not delivered."
 
@@ -94,9 +100,6 @@ def mytodos_summary(preview_per_section: int = 2):
             "message": None if delivered else RAVEN_UNAVAILABLE_MSG}
 
 
-def _bot():
-    return frappe.get_doc("Raven Bot", "todo-bot")
-
 @frappe.whitelist()
 def agent_todo_digest(args=None, user_email: str | None = None, mode: str = "summary",
                       preview_per_section: int = 2, send_dm: int = 1):
@@ -135,8 +138,8 @@ def agent_todo_digest(args=None, user_email: str | None = None, mode: str = "sum
         md = format_todo_summary_markdown(user, int(preview_per_section))
 
     delivered = False
-    if int(send_dm) and raven_available():
-        _bot().send_direct_message(user_id=user, text=md, markdown=True)
+    if int(send_dm) and delivery_available():
+        deliver(user, md)
         delivered = True
 
     result = {"ok": True, "user": user, "mode": mode, "markdown": md, "delivered": delivered}
@@ -146,6 +149,7 @@ def agent_todo_digest(args=None, user_email: str | None = None, mode: str = "sum
 
 
 @frappe.whitelist()
+@replica_read("get_projects_overview")
 def get_projects_overview(search: str | None = None, limit: int = 50, status: str | None = None):
     """
     Return a list of projects with key rollups:
@@ -162,9 +166,15 @@ def get_projects_overview(search: str | None = None, limit: int = 50, status: st
     has_pm_col = frappe.db.has_column("Project", "project_manager")
     pm_select = "p.project_manager" if has_pm_col else "NULL AS project_manager"
 
-    # 1) Base project list
+    # 1) Base project list, scoped to the caller's readable projects (cached per user)
     where = ["1=1"]
     params = {}
+    allowed = allowed_projects()
+    if allowed is not None:
+        if not allowed:
+            return {"ok": True, "data": []}
+        where.append("p.name IN %(allowed)s")
+        params["allowed"] = tuple(allowed)
     if status:
         where.append("p.status=%(status)s")
         params["status"] = status
@@ -251,6 +261,11 @@ def get_projects_overview(search: str | None = None, limit: int = 50, status: st
     # Enabled users (system users) for filtering
     enabled_users = set(frappe.get_all("User", filters={"enabled": 1, "user_type": "System User"}, pluck="name"))
 
+    # Burn-rate forecasts (cached nightly, Open projects only)
+    forecasts = get_forecasts()
+    # Per-user budgeted/logged hours (cached per project)
+    workload_map = workload.get_matrix(proj_names)
+
     # Build response
     out = []
     for p in projects:
@@ -282,12 +297,19 @@ def get_projects_overview(search: str | None = None, limit: int = 50, status: st
                  if u and u.lower() not in ("administrator", "guest") and u in enabled_users}
             ))(assignees_map.get(nm, []) or [], members_map.get(nm, []) or []),
             "members": sorted(set(members_map.get(nm, []))),
+            "forecast": forecasts.get(nm),
+            "workload": {
+                **workload.project_totals(workload_map.get(nm) or {}),
+                "users": sorted((workload_map.get(nm) or {}).values(), key=lambda r: -r["remaining"]),
+            },
         })
     return {"ok": True, "data": out}
 
 @frappe.whitelist()
+@replica_read("get_project_detail")
 def get_project_detail(project: str):
     """Detailed drilldown for one project: top open tasks, recent timesheets, members."""
+    check_project_access(project)
     # light sample; expand as needed
     detail = {"project": project}
 
@@ -316,4 +338,118 @@ def get_project_detail(project: str):
     members = frappe.get_all("Project User", filters={"parent": project}, fields=["user"])
     detail["members"] = members
 
-    return {"ok": True, "data": detail}
\ No newline at end of file
+    return {"ok": True, "data": detail}
+
+
+@frappe.whitelist()
+def find_similar_decisions(decision: str | None = None, text: str | None = None, top_k: int = 5):
+    """Top-k likely duplicates of an existing decision (by name) or of free text."""
+    frappe.has_permission("Decision Ledger", "read", throw=True)
+    exclude = []
+    if decision:
+        doc = frappe.get_doc("Decision Ledger", decision)
+        doc.check_permission("read")
+        text = similarity.decision_text(doc)
+        exclude = [doc.name, doc.amended_from]
+    if not (text or "").strip():
+        frappe.throw("decision or text is required")
+    return {"ok": True, "data": similarity.find_similar(text, cint(top_k) or 5, exclude=exclude)}
+
+
+@frappe.whitelist()
+def get_duplicate_groups(refresh: int = 0):
+    """Duplicate clusters from the last bulk run; `refresh=1` queues a rebuild."""
+    frappe.only_for("System Manager")
+    if cint(refresh):
+        frappe.enqueue("decision_ledger.similarity.rebuild_and_cluster", queue="long",
+                       job_id="decision_ledger:rebuild_similarity", deduplicate=True)
+    groups = frappe.cache().get_value("decision_ledger:duplicate_groups")
+    return {"ok": True, "data": groups or [], "queued": bool(cint(refresh))}
+
+
+@frappe.whitelist()
+def get_decision_analytics(project: str | None = None, from_date=None, to_date=None):
+    """Per-project/per-month decision counts plus the master lists to label them."""
+    frappe.has_permission("Decision Ledger", "read", throw=True)
+    return {
+        "ok": True,
+        "data": analytics.get_rollups(project, from_date, to_date),
+        "masters": get_all_masters(),
+    }
+
+
+@frappe.whitelist()
+def get_decision_masters():
+    """Cached Decision Area / Status / Impact Type lists for dashboards."""
+    return {"ok": True, "data": get_all_masters()}
+
+
+@frappe.whitelist()
+def get_decision_lineage(decision: str):
+    """Every revision in `decision`'s amendment chain, oldest first."""
+    frappe.has_permission("Decision Ledger", "read", decision, throw=True)
+    return {"ok": True, "data": lineage.get_chain(decision)}
+
+
+@frappe.whitelist()
+def get_latest_decisions(project: str | None = None, include_cancelled: int = 0,
+                         limit: int = 50, start: int = 0):
+    """Latest revision of each decision (optionally for one project)."""
+    return {"ok": True, "data": lineage.get_latest(project, include_cancelled, limit, start)}
+
+
+@frappe.whitelist()
+def get_replica_status():
+    """Read-replica routing settings and current replication lag."""
+    frappe.only_for("System Manager")
+    return {"ok": True, "data": replica_status()}
+
+
+@frappe.whitelist()
+def get_budget_forecast(project: str | None = None):
+    """Burn rate, projected completion cost and overrun date per Open project."""
+    data = get_forecasts()
+    if project:
+        check_project_access(project)
+        data = {project: data.get(project)}
+    else:
+        data = {p: data[p] for p in filter_projects(data)}
+    return {"ok": True, "data": data}
+
+
+@frappe.whitelist()
+def get_team_workload(project: str | None = None, user: str | None = None):
+    """User x project matrix of budgeted/logged/remaining hours and open ToDos.
+
+    Returns the matrix rows plus per-user totals across projects (busiest first).
+    """
+    if project:
+        check_project_access(project)
+        projects = [project]
+    else:
+        projects = filter_projects(frappe.get_all("Project", filters={"status": "Open"}, pluck="name"))
+    matrix = workload.get_matrix(projects)
+    rows = [
+        {"project": p, **r}
+        for p, users in matrix.items()
+        for u, r in users.items()
+        if not user or u == user
+    ]
+    totals = sorted(
+        (t for t in workload.user_totals(matrix).values() if not user or t["user"] == user),
+        key=lambda t: -t["remaining"],
+    )
+    return {"ok": True, "data": rows, "users": totals}
+
+
+@frappe.whitelist()
+def get_project_trend(project: str, from_date=None, to_date=None, metrics=None):
+    """Daily (then weekly/monthly, as downsampled) health snapshots for a project.
+
+    `metrics` may be a JSON list or comma-separated names, e.g. "tasks_open,cost".
+    """
+    check_project_access(project)
+    if isinstance(metrics, str):
+        metrics = frappe.parse_json(metrics) if metrics.strip().startswith("[") else metrics.split(",")
+    metrics = [m.strip() for m in metrics or [] if m and m.strip()]
+    return {"ok": True, "data": snapshots.get_trend(project, from_date, to_date, metrics)}
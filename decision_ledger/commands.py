@@ -0,0 +1,33 @@
+import json
+
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("digest-load-test")
+@click.option("--users", default=10000, help="Number of synthetic recipients")
+@click.option("--mode", default="summary", type=click.Choice(["summary", "full", "todo"]))
+@click.option("--latency-ms", default=20.0, help="Fake Raven latency per round trip (one per batch)")
+@click.option("--jitter-ms", default=5.0, help="Random latency spread (±)")
+@click.option("--error-rate", default=0.01, help="Fraction of sends that fail transiently")
+@click.option("--rate-limit", default=0.0, help="Messages/sec allowed by the fake backend (0 = unlimited)")
+@click.option("--seed", default=None, type=int, help="Seed for reproducible error injection")
+@click.option("--keep", is_flag=True, default=False, help="Keep the Digest Run/Delivery records")
+@pass_context
+def digest_load_test(context, users, mode, latency_ms, jitter_ms, error_rate, rate_limit, seed, keep):
+    """Run the digest job against an in-process fake Raven and report throughput."""
+    import frappe
+    from decision_ledger.loadtest import run_load_test
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        report = run_load_test(users=users, mode=mode, latency_ms=latency_ms, jitter_ms=jitter_ms,
+                               error_rate=error_rate, rate_limit=rate_limit, seed=seed, keep=keep)
+        click.echo(json.dumps(report, indent=2, default=str))
+    finally:
+        frappe.destroy()
+
+
+commands = [digest_load_test]
@@ -4,6 +4,15 @@
 # import frappe
 from frappe.model.document import Document
 
+from decision_ledger import masters
+
 
 class DecisionArea(Document):
-	pass
+	def on_update(self):
+		masters.invalidate(self.doctype)
+
+	def after_rename(self, old, new, merge=False):
+		masters.invalidate(self.doctype)
+
+	def after_delete(self):
+		masters.invalidate(self.doctype)
@@ -1,9 +1,92 @@
 # Copyright (c) 2025, QCS and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
+from decision_ledger import analytics, portal, similarity
+
 
 class DecisionLedger(Document):
-	pass
+	def validate(self):
+		if self.is_new():
+			self.set_lineage()
+		self.warn_possible_duplicates()
+
+	def after_insert(self):
+		if self.amended_from:
+			# The new amendment becomes the current version of its chain
+			frappe.db.sql("""
+				UPDATE `tabDecision Ledger` SET is_latest_revision=0
+				WHERE lineage_root=%s AND name!=%s AND is_latest_revision=1
+			""", (self.lineage_root, self.name))
+
+	def on_update(self):
+		similarity.update_index(self)
+		analytics.on_decision_change(self)
+
+	def on_submit(self):
+		portal.invalidate(self)
+
+	def on_update_after_submit(self):
+		portal.invalidate(self)
+
+	def on_cancel(self):
+		similarity.remove_from_index(self.name)
+		analytics.on_decision_change(self)
+		portal.invalidate(self)
+
+	def on_trash(self):
+		similarity.remove_from_index(self.name)
+		if self.amended_from and self.is_latest_revision:
+			# Deleting a draft amendment hands "latest" back to the previous revision
+			frappe.db.set_value("Decision Ledger", self.amended_from, "is_latest_revision", 1,
+				update_modified=False)
+
+	def before_rename(self, old, new, merge=False):
+		if merge:
+			# The target keeps its own fingerprint; `decision` is unique
+			similarity.remove_from_index(old)
+
+	def after_delete(self):
+		analytics.refresh_rollup(self.project, self.creation)
+
+	def set_lineage(self):
+		"""Root id and revision number, derived from `amended_from` once at insert."""
+		if self.amended_from:
+			parent = frappe.db.get_value(
+				"Decision Ledger", self.amended_from, ["lineage_root", "revision"], as_dict=True
+			) or {}
+			self.lineage_root = parent.get("lineage_root") or self.amended_from
+			self.revision = (parent.get("revision") or 0) + 1
+		else:
+			self.lineage_root = self.name
+			self.revision = 0
+		self.is_latest_revision = 1
+
+	def warn_possible_duplicates(self):
+		"""Non-blocking hint when the ledger already holds a near-identical decision."""
+		if frappe.flags.in_import or frappe.flags.in_patch or self.docstatus != 0:
+			return
+		matches = similarity.find_similar(
+			similarity.decision_text(self), top_k=3, exclude=[self.name, self.amended_from]
+		)
+		if not matches:
+			return
+		rows = "".join(
+			f"<li>{frappe.utils.get_link_to_form('Decision Ledger', m['decision'])}"
+			f" ({m['project'] or '-'}, {int(m['similarity'] * 100)}% similar)</li>"
+			for m in matches
+		)
+		frappe.msgprint(
+			f"Possible duplicate decisions:<ul>{rows}</ul>",
+			title="Similar decisions found",
+			indicator="orange",
+		)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Decision Ledger", ["lineage_root", "revision"])
+	frappe.db.add_index("Decision Ledger", ["is_latest_revision", "project"])
+	# Portal keyset pagination: submitted decisions per project, newest first
+	frappe.db.add_index("Decision Ledger", ["project", "docstatus", "modified"])
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, QCS and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings["Decision Ledger"] = {
+	add_fields: ["revision", "is_latest_revision"],
+	// Show the current version of each decision by default; clear the filter for full history
+	filters: [["is_latest_revision", "=", 1]],
+};
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, QCS and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Decision Rollup", {
+// 	refresh(frm) {
+
+// 	},
+// });
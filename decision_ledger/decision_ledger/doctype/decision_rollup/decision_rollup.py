@@ -0,0 +1,14 @@
+# Copyright (c) 2026, QCS and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class DecisionRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Decision Rollup", ["project", "month"])
+	frappe.db.add_index("Decision Rollup", ["month"])
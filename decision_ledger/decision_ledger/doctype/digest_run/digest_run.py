@@ -0,0 +1,13 @@
+# Copyright (c) 2026, QCS and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class DigestRun(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Digest Run", ["mode", "digest_date", "shard"])
@@ -0,0 +1,15 @@
+# Copyright (c) 2026, QCS and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ProjectHealthSnapshot(Document):
+	pass
+
+
+def on_doctype_update():
+	# Trend reads are range scans per project; retention scans by date
+	frappe.db.add_index("Project Health Snapshot", ["project", "snapshot_date"])
+	frappe.db.add_index("Project Health Snapshot", ["snapshot_date", "granularity"])
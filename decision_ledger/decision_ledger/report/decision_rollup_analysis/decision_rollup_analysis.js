@@ -0,0 +1,37 @@
+// Copyright (c) 2026, QCS and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Decision Rollup Analysis"] = {
+	filters: [
+		{
+			fieldname: "project",
+			label: __("Project"),
+			fieldtype: "Link",
+			options: "Project",
+		},
+		{
+			fieldname: "from_date",
+			label: __("From Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.add_months(frappe.datetime.get_today(), -12),
+		},
+		{
+			fieldname: "to_date",
+			label: __("To Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.get_today(),
+		},
+		{
+			fieldname: "decision_area",
+			label: __("Decision Area"),
+			fieldtype: "Link",
+			options: "Decision Area",
+		},
+		{
+			fieldname: "decision_impact_type",
+			label: __("Decision Impact Type"),
+			fieldtype: "Link",
+			options: "Decision Impact Type",
+		},
+	],
+};
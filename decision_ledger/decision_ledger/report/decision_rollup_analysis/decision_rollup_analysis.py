@@ -0,0 +1,43 @@
+# Copyright (c) 2026, QCS and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import cint
+
+from decision_ledger.analytics import get_rollups
+from decision_ledger.masters import get_master_values
+
+
+def execute(filters=None):
+	"""Decision counts per project and month, one column per Decision Status.
+
+	Reads the precomputed `Decision Rollup` rows; status columns come from the
+	cached master list, so the report never groups over the raw ledger.
+	"""
+	filters = frappe._dict(filters or {})
+	statuses = get_master_values("Decision Status")
+
+	rows = {}
+	for r in get_rollups(
+		filters.project,
+		filters.from_date,
+		filters.to_date,
+		decision_area=filters.decision_area,
+		decision_impact_type=filters.decision_impact_type,
+	):
+		key = (r.project, r.month)
+		row = rows.setdefault(key, {"project": r.project, "month": r.month, "total": 0})
+		field = frappe.scrub(r.decision_status or "")
+		row[field] = row.get(field, 0) + cint(r.decision_count)
+		row["total"] += cint(r.decision_count)
+
+	columns = [
+		{"label": "Project", "fieldname": "project", "fieldtype": "Link", "options": "Project", "width": 180},
+		{"label": "Month", "fieldname": "month", "fieldtype": "Date", "width": 110},
+	]
+	columns += [
+		{"label": s, "fieldname": frappe.scrub(s), "fieldtype": "Int", "width": 110} for s in statuses
+	]
+	columns.append({"label": "Total", "fieldname": "total", "fieldtype": "Int", "width": 90})
+
+	return columns, list(rows.values())
@@ -0,0 +1,260 @@
+import random
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint, flt
+
+from .raven_utils import bulk_delivery_supported, bulk_insert_messages, log_raven_skip, raven_available
+from .profiling import in_phase
+
+# Pluggable delivery for digest/DM messages. Every sender goes through
+# `deliver()`, which dispatches to the active backend:
+#   - RavenBackend (default): the real Raven bot / Raven Message paths
+#   - FakeRavenBackend: in-process stand-in with latency, errors and rate limits,
+#     used by the load-test command; select it with site config
+#     `decision_ledger_delivery_backend: "fake"` or `use_backend()`.
+# Digest runs use `deliver_many()`, which hands a whole chunk of recipients to
+# the backend's `send_many()` (one batched write for Raven when
+# `decision_ledger_raven_bulk_delivery` is set).
+
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.05
+SEND_SAVEPOINT = "dl_send"
+
+
+class DeliveryError(Exception):
+    """Transient delivery failure; `deliver()` retries these."""
+
+
+class RateLimited(DeliveryError):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after:.3f}s")
+        self.retry_after = retry_after
+
+
+class DeliveryStats:
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.batches = 0
+        self.latencies = []  # seconds per delivered message, retries included
+
+    def as_dict(self) -> dict:
+        return {"sent": self.sent, "failed": self.failed, "retries": self.retries,
+                "rate_limited": self.rate_limited, "batches": self.batches}
+
+
+def _send_each(backend, items, via: str) -> dict:
+    """Per-message fallback for `send_many`: {user: None | exception}.
+
+    Each message gets its own savepoint, so a failed insert only undoes its own
+    writes. If that rollback fails too (e.g. a deadlock already aborted the
+    transaction, taking the earlier messages with it), the error propagates and
+    the caller must treat the whole batch as undelivered.
+    """
+    results = {}
+    for user, text in items:
+        frappe.db.savepoint(SEND_SAVEPOINT)
+        try:
+            backend.send(user, text, via=via)
+            results[user] = None
+        except Exception as e:
+            frappe.db.rollback(save_point=SEND_SAVEPOINT)
+            results[user] = e
+    return results
+
+
+class RavenBackend:
+    name = "raven"
+
+    def __init__(self):
+        self.stats = DeliveryStats()
+
+    def available(self) -> bool:
+        return raven_available()
+
+    def send(self, user: str, text: str, via: str = "bot"):
+        if via == "channel":
+            from .todo_notifier import _insert_dm_message
+            _insert_dm_message(user, text)
+        else:
+            frappe.get_doc("Raven Bot", "todo-bot").send_direct_message(user_id=user, text=text, markdown=True)
+
+    def send_many(self, items, via: str = "bot") -> dict:
+        """Batched insert of all messages when bulk mode is enabled (see
+        `bulk_delivery_supported`); per-doc inserts otherwise or if the batch fails."""
+        if not bulk_delivery_supported():
+            return _send_each(self, items, via)
+        frappe.db.savepoint("dl_bulk_delivery")
+        try:
+            bulk_insert_messages(items, via=via)
+            return {user: None for user, _ in items}
+        except Exception as e:
+            frappe.db.rollback(save_point="dl_bulk_delivery")
+            log_raven_skip(f"Bulk Raven insert failed, falling back to per-message inserts: {e}")
+            return _send_each(self, items, via)
+
+
+class FakeRavenBackend:
+    """In-process Raven stand-in: sleeps `latency_ms` (± `jitter_ms`), fails
+    `error_rate` of calls and enforces `rate_limit` messages/sec with a token bucket."""
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 rate_limit: float = 0, seed: int | None = None):
+        self.latency = flt(latency_ms) / 1000
+        self.jitter = flt(jitter_ms) / 1000
+        self.error_rate = flt(error_rate)
+        self.rate_limit = flt(rate_limit)
+        self.random = random.Random(seed)
+        self.stats = DeliveryStats()
+        self.messages = 0
+        self._tokens = self.rate_limit
+        self._refilled_at = time.monotonic()
+
+    def available(self) -> bool:
+        return True
+
+    def _take_token(self):
+        if not self.rate_limit:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            raise RateLimited((1 - self._tokens) / self.rate_limit)
+        self._tokens -= 1
+
+    def _wait(self):
+        delay = self.latency + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _accept(self):
+        self._take_token()
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise DeliveryError("fake raven: injected failure")
+        self.messages += 1
+
+    def send(self, user: str, text: str, via: str = "bot"):
+        self._wait()
+        self._accept()
+
+    def send_many(self, items, via: str = "bot") -> dict:
+        """One round trip per batch; rate limit and errors still apply per message."""
+        self._wait()
+        results, limited = {}, 0
+        for user, _text in items:
+            try:
+                self._accept()
+                results[user] = None
+            except RateLimited as e:
+                # Later messages queue behind earlier ones for the next refill
+                results[user] = RateLimited(e.retry_after + limited / self.rate_limit)
+                limited += 1
+            except DeliveryError as e:
+                results[user] = e
+        return results
+
+
+_BACKENDS = {"raven": RavenBackend, "fake": FakeRavenBackend}
+
+
+def get_backend():
+    backend = getattr(frappe.local, "dl_delivery_backend", None)
+    if backend is None:
+        name = frappe.conf.get("decision_ledger_delivery_backend") or "raven"
+        backend = _BACKENDS.get(name, RavenBackend)()
+        frappe.local.dl_delivery_backend = backend
+    return backend
+
+
+@contextmanager
+def use_backend(backend):
+    """Temporarily route all deliveries through `backend` (load tests, scripts)."""
+    previous = getattr(frappe.local, "dl_delivery_backend", None)
+    frappe.local.dl_delivery_backend = backend
+    try:
+        yield backend
+    finally:
+        frappe.local.dl_delivery_backend = previous
+
+
+def delivery_available() -> bool:
+    return get_backend().available()
+
+
+@in_phase("deliver")
+def deliver(user: str, text: str, via: str = "bot"):
+    """Send one DM through the active backend, retrying transient failures."""
+    backend = get_backend()
+    stats = backend.stats
+    started = time.monotonic()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            backend.send(user, text, via=via)
+            break
+        except RateLimited as e:
+            stats.rate_limited += 1
+            if attempt == MAX_RETRIES:
+                stats.failed += 1
+                raise
+            stats.retries += 1
+            time.sleep(e.retry_after)
+        except DeliveryError:
+            if attempt == MAX_RETRIES:
+                stats.failed += 1
+                raise
+            stats.retries += 1
+            time.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+    stats.sent += 1
+    stats.latencies.append(time.monotonic() - started)
+
+
+@in_phase("deliver")
+def deliver_many(items, via: str = "bot") -> dict:
+    """Send [(user, text), ...] as batches, retrying transient per-message failures.
+
+    Returns {user: None | exception} for every item.
+    """
+    backend = get_backend()
+    stats = backend.stats
+    started = time.monotonic()
+    results, pending = {}, list(items)
+    for attempt in range(MAX_RETRIES + 1):
+        if not pending:
+            break
+        stats.batches += 1
+        outcome = backend.send_many(pending, via=via)
+        retry, wait = [], 0.0
+        for user, text in pending:
+            error = outcome.get(user)
+            if isinstance(error, RateLimited):
+                stats.rate_limited += 1
+                wait = max(wait, error.retry_after)
+            if error is None:
+                results[user] = None
+                stats.sent += 1
+                stats.latencies.append(time.monotonic() - started)
+            elif isinstance(error, DeliveryError) and attempt < MAX_RETRIES:
+                retry.append((user, text))
+                stats.retries += 1
+            else:
+                results[user] = error
+                stats.failed += 1
+        pending = retry
+        if pending:
+            time.sleep(wait or RETRY_BACKOFF_SECONDS * (2 ** attempt))
+    return results
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, cint(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
@@ -0,0 +1,216 @@
+import json
+
+import frappe
+from frappe.utils import add_days, add_to_date, cint, get_datetime, now_datetime, nowdate
+
+from .delivery import deliver_many
+
+# A digest job is recorded as a `Digest Run` (one per mode/date/shard) with one
+# `Digest Delivery` per recipient, named by its idempotency key. Recipients are
+# processed in chunks of CHUNK_SIZE: the chunk's messages go out through one
+# `deliver_many()` batch and are committed together with its Digest Delivery
+# rows, so a run that dies part-way resumes from its checkpoint and never
+# re-sends to a user that already got that day's digest.
+
+MAX_ATTEMPTS = 3
+CHUNK_SIZE = 200
+# Shards of `bench digest-load-test` runs: synthetic recipients, never resumed
+LOAD_TEST_SHARD_PREFIX = "loadtest-"
+# A "Running" run untouched for this long is treated as abandoned and resumable
+STALE_AFTER_MINUTES = 15
+
+
+def idempotency_key(user: str, digest_date, mode: str) -> str:
+    return f"{mode}:{digest_date}:{user}"
+
+
+def _renderer(mode: str):
+    """(render, via): render(user) -> markdown, or None when there is nothing to send."""
+    if mode == "todo":
+        from .todo_notifier import render_todo_digest
+        return render_todo_digest, "channel"
+
+    from .todo_digest import format_todo_markdown, format_todo_summary_markdown
+    if mode == "full":
+        return format_todo_markdown, "bot"
+    return (lambda user: format_todo_summary_markdown(user, preview_per_section=2)), "bot"
+
+
+def get_or_create_run(mode: str, digest_date, shard: str, users) -> "frappe.model.document.Document":
+    name = frappe.db.get_value("Digest Run", {"mode": mode, "digest_date": digest_date, "shard": shard})
+    if name:
+        return frappe.get_doc("Digest Run", name)
+
+    run = frappe.get_doc({
+        "doctype": "Digest Run",
+        "mode": mode,
+        "digest_date": digest_date,
+        "shard": shard,
+        "status": "Queued",
+        "recipients": json.dumps(users),
+        "total_users": len(users),
+    }).insert(ignore_permissions=True)
+    frappe.db.commit()
+    return run
+
+
+def _is_active(run) -> bool:
+    """Another worker is still driving this run (recent heartbeat)."""
+    if run.status != "Running":
+        return False
+    return get_datetime(run.modified) > add_to_date(now_datetime(), minutes=-STALE_AFTER_MINUTES)
+
+
+def run_digest(mode: str, users, digest_date=None, shard: str = "all", fallback_text: str | None = None):
+    """Deliver `mode` digests to `users`, resuming any earlier run for the same key.
+
+    `fallback_text` is sent instead of skipping a user whose digest renders empty
+    (load tests, so every recipient exercises delivery).
+    """
+    digest_date = str(digest_date or nowdate())
+    users = sorted({u for u in users or [] if u})
+    run = get_or_create_run(mode, digest_date, shard, users)
+    if run.status == "Completed" or _is_active(run):
+        return run
+
+    # Recipients added since the run was created (e.g. a retry with a fresh list)
+    known = json.loads(run.recipients or "[]")
+    recipients = sorted(set(known) | set(users))
+
+    attempts = dict(frappe.get_all(
+        "Digest Delivery",
+        filters={"digest_run": run.name},
+        fields=["user", "attempts"],
+        as_list=True,
+    ))
+    done = set(frappe.get_all(
+        "Digest Delivery",
+        filters={"digest_date": digest_date, "mode": mode, "status": ["in", ["Delivered", "Skipped"]]},
+        pluck="user",
+    ))
+    pending = [u for u in recipients if u not in done and cint(attempts.get(u)) < MAX_ATTEMPTS]
+
+    run.db_set({
+        "status": "Running",
+        "recipients": json.dumps(recipients),
+        "total_users": len(recipients),
+        "started_at": run.started_at or now_datetime(),
+    })
+    frappe.db.commit()
+
+    render, via = _renderer(mode)
+    if fallback_text:
+        base_render = render
+
+        def render(user):
+            return base_render(user) or fallback_text
+
+    for i in range(0, len(pending), CHUNK_SIZE):
+        chunk = pending[i:i + CHUNK_SIZE]
+        _deliver_chunk(run, chunk, mode, digest_date, render, via)
+        run.db_set("checkpoint_user", chunk[-1])
+        frappe.db.commit()
+
+    _finish(run, log_failures=bool(pending))
+    return run
+
+
+def _deliver_chunk(run, chunk, mode, digest_date, render, via):
+    """Render, send and record one chunk of recipients (committed by the caller)."""
+    outcomes, outgoing = {}, []
+    for user in chunk:
+        try:
+            text = render(user)
+        except Exception as e:
+            outcomes[user] = ("Failed", str(e)[:1000])
+            continue
+        if text:
+            outgoing.append((user, text))
+        else:
+            outcomes[user] = ("Skipped", None)
+
+    if outgoing:
+        try:
+            results = deliver_many(outgoing, via=via)
+        except Exception as e:
+            # The transaction is gone (or half-written): none of the chunk persisted
+            frappe.db.rollback()
+            results = {user: e for user, _ in outgoing}
+        for user, _ in outgoing:
+            error = results.get(user)
+            outcomes[user] = ("Failed", str(error)[:1000]) if error else ("Delivered", None)
+
+    _record_deliveries(run, mode, digest_date, outcomes)
+
+
+def _record_deliveries(run, mode, digest_date, outcomes: dict):
+    """Upsert Digest Delivery rows for {user: (status, error)}: new keys go in one
+    batched insert, retries of earlier attempts are updated in place."""
+    keys = {user: idempotency_key(user, digest_date, mode) for user in outcomes}
+    existing = dict(frappe.get_all(
+        "Digest Delivery",
+        filters={"name": ["in", list(keys.values())]},
+        fields=["name", "attempts"],
+        as_list=True,
+    )) if keys else {}
+
+    ts, owner = now_datetime(), frappe.session.user
+    rows = []
+    for user, (status, error) in outcomes.items():
+        key = keys[user]
+        delivered_at = ts if status == "Delivered" else None
+        if key in existing:
+            frappe.db.set_value("Digest Delivery", key, {
+                "digest_run": run.name,
+                "status": status,
+                "error": error,
+                "delivered_at": delivered_at,
+                "attempts": cint(existing[key]) + 1,
+            })
+        else:
+            rows.append((key, ts, ts, owner, owner, key, user, mode, digest_date, run.name,
+                         status, error, delivered_at, 1))
+
+    if rows:
+        frappe.db.bulk_insert(
+            "Digest Delivery",
+            fields=["name", "creation", "modified", "owner", "modified_by", "idempotency_key",
+                    "user", "mode", "digest_date", "digest_run", "status", "error",
+                    "delivered_at", "attempts"],
+            values=rows,
+        )
+
+
+def _finish(run, log_failures: bool = True):
+    counts = dict(frappe.db.sql("""
+        SELECT status, COUNT(*) FROM `tabDigest Delivery`
+        WHERE digest_run=%s GROUP BY status
+    """, run.name))
+    failed = cint(counts.get("Failed"))
+    run.db_set({
+        "status": "Failed" if failed else "Completed",
+        "delivered_count": cint(counts.get("Delivered")),
+        "skipped_count": cint(counts.get("Skipped")),
+        "failed_count": failed,
+        "finished_at": now_datetime(),
+    })
+    frappe.db.commit()
+    if failed and log_failures:
+        frappe.log_error(f"Digest run {run.name}: {failed} of {run.total_users} deliveries failed",
+                         "todo-bot")
+
+
+def resume_incomplete_runs():
+    """Scheduler: pick up runs from the last two days that died or left retriable failures."""
+    for run in frappe.get_all(
+        "Digest Run",
+        filters={"status": ["in", ["Queued", "Running", "Failed"]],
+                 "digest_date": [">=", add_days(nowdate(), -1)],
+                 "shard": ["not like", f"{LOAD_TEST_SHARD_PREFIX}%"]},
+        fields=["name", "mode", "digest_date", "shard"],
+        order_by="creation asc",
+    ):
+        try:
+            run_digest(run.mode, [], run.digest_date, run.shard)
+        except Exception as e:
+            frappe.log_error(f"Resuming digest run {run.name} failed: {e}", "todo-bot")
@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+import frappe
+import numpy as np
+from frappe.utils import getdate, nowdate
+
+# Budget burn-rate forecasting for all active projects at once.
+#
+# Daily cost/hours from submitted Timesheet Details are loaded in one grouped
+# query and scattered into a (projects x days) matrix; burn rate, projected cost
+# and overrun dates are then plain array operations across every project.
+# Results are cached and refreshed nightly by the scheduler; readers serve the
+# cached result even when stale and queue a refresh.
+
+WINDOW_DAYS = 28
+CACHE_KEY = "decision_ledger:budget_forecast"
+# Flag projects whose projected cost exceeds this share of the budget
+AT_RISK_RATIO = 0.9
+
+
+def _load():
+    projects = frappe.db.sql("""
+        SELECT p.name, p.expected_end_date,
+               COALESCE(p.estimated_costing, p.total_costing_amount, 0) AS budget
+        FROM `tabProject` p
+        WHERE p.status = 'Open'
+    """, as_dict=True)
+
+    series = frappe.db.sql("""
+        SELECT d.project, DATE(d.from_time) AS day,
+               SUM(d.costing_amount) AS cost, SUM(d.hours) AS hours
+        FROM `tabTimesheet Detail` d
+        JOIN `tabTimesheet` ts ON ts.name = d.parent AND ts.docstatus = 1
+        JOIN `tabProject` p ON p.name = d.project AND p.status = 'Open'
+        WHERE d.from_time IS NOT NULL
+        GROUP BY d.project, DATE(d.from_time)
+    """, as_list=True)
+    return projects, series
+
+
+def compute_forecasts(today=None) -> dict:
+    """{project: forecast dict} for every Open project."""
+    projects, series = _load()
+    return forecast_from_rows(projects, series, getdate(today or nowdate()))
+
+
+def forecast_from_rows(projects, series, today) -> dict:
+    """The array math behind compute_forecasts.
+
+    `projects`: rows with name, budget and expected_end_date; `series`:
+    [project, day, cost, hours] per project-day.
+    """
+    if not projects:
+        return {}
+
+    names = [p.name for p in projects]
+    index = {name: i for i, name in enumerate(names)}
+    budget = np.array([float(p.budget or 0) for p in projects])
+    days_left = np.array([
+        max((getdate(p.expected_end_date) - today).days, 0) if p.expected_end_date else -1
+        for p in projects
+    ], dtype=float)
+
+    first_day = min((getdate(r[1]) for r in series), default=today)
+    first_day = min(first_day, today - timedelta(days=WINDOW_DAYS - 1))
+    n_days = (today - first_day).days + 1
+
+    cost = np.zeros((len(names), n_days))
+    hours = np.zeros((len(names), n_days))
+    if series:
+        rows = [(index[r[0]], (getdate(r[1]) - first_day).days, r[2] or 0, r[3] or 0)
+                for r in series if (getdate(r[1]) - first_day).days < n_days]
+        if rows:
+            pi, di, c, h = (np.array(col) for col in zip(*rows))
+            np.add.at(cost, (pi.astype(int), di.astype(int)), c.astype(float))
+            np.add.at(hours, (pi.astype(int), di.astype(int)), h.astype(float))
+
+    spent = cost.sum(axis=1)
+    burn_rate = cost[:, -WINDOW_DAYS:].sum(axis=1) / WINDOW_DAYS
+    hours_rate = hours[:, -WINDOW_DAYS:].sum(axis=1) / WINDOW_DAYS
+
+    has_budget = budget > 0
+    has_end = days_left >= 0
+    remaining = budget - spent
+    projected_cost = np.where(has_end, spent + burn_rate * np.maximum(days_left, 0), np.nan)
+
+    # Already over budget: the day cumulative cost first crossed it
+    cumulative = cost.cumsum(axis=1)
+    crossed = cumulative >= budget[:, None]
+    over = has_budget & crossed[:, -1]
+    crossed_idx = crossed.argmax(axis=1)
+
+    # Not yet over: days until the current burn rate exhausts the budget
+    burning = has_budget & ~over & (burn_rate > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_to_overrun = np.where(burning, np.ceil(remaining / burn_rate), np.nan)
+
+    at_risk = has_budget & ~over & (
+        (has_end & (projected_cost > budget * AT_RISK_RATIO))
+        | (burning & has_end & (days_to_overrun <= days_left))
+    )
+
+    out = {}
+    for i, name in enumerate(names):
+        if over[i]:
+            overrun_date, status = first_day + timedelta(days=int(crossed_idx[i])), "over_budget"
+        elif burning[i]:
+            overrun_date = today + timedelta(days=int(days_to_overrun[i]))
+            status = "at_risk" if at_risk[i] else "on_track"
+        else:
+            overrun_date = None
+            status = "at_risk" if at_risk[i] else ("on_track" if has_budget[i] else "no_budget")
+
+        out[name] = {
+            "spent": round(float(spent[i]), 2),
+            "budget": round(float(budget[i]), 2),
+            "burn_rate": round(float(burn_rate[i]), 2),
+            "hours_per_day": round(float(hours_rate[i]), 2),
+            "projected_cost": None if np.isnan(projected_cost[i]) else round(float(projected_cost[i]), 2),
+            "overrun_date": str(overrun_date) if overrun_date else None,
+            "status": status,
+        }
+    return out
+
+
+def refresh_budget_forecasts():
+    """Nightly scheduler job."""
+    data = compute_forecasts()
+    frappe.cache().set_value(CACHE_KEY, {"as_of": nowdate(), "data": data})
+    return data
+
+
+def get_forecasts() -> dict:
+    """Last cached forecasts, possibly from an earlier day ({} before the first run).
+
+    A stale or missing cache queues one background refresh instead of recomputing
+    inside the request.
+    """
+    cached = frappe.cache().get_value(CACHE_KEY)
+    if not cached or cached.get("as_of") != nowdate():
+        frappe.enqueue("decision_ledger.forecast.refresh_budget_forecasts", queue="long",
+                       job_id="decision_ledger:refresh_budget_forecasts", deduplicate=True)
+    return cached["data"] if cached else {}
@@ -26,12 +26,23 @@ app_license = "mit"
 after_install = "decision_ledger.install.after_install"
 
 scheduler_events = {
-    # 05:00 UTC ≈ 09:00 Asia/Dubai
     "cron": {
-        "0 4 * * *": ["decision_ledger.schedules.send_daily_summaries"],
-        # Weekly full digest every Monday 05:00 UTC
-        "0 4 * * MON": ["decision_ledger.schedules.send_weekly_full"],
-    }
+        # Hourly shard: users whose local time (User.time_zone) just reached their
+        # digest hour; full digest replaces the summary on their local Monday
+        "0 * * * *": ["decision_ledger.schedules.dispatch_digests"],
+        # Resume interrupted digest runs (checkpointed per user, idempotent)
+        "30 * * * *": ["decision_ledger.schedules.resume_digest_runs"],
+    },
+    "daily": [
+        # Recompute budget burn-rate forecasts for all Open projects
+        "decision_ledger.forecast.refresh_budget_forecasts",
+        # Append one health snapshot per Open project, then downsample old ones
+        "decision_ledger.snapshots.take_snapshots",
+    ],
+    "weekly": [
+        # Refresh the decision similarity index and cache duplicate groups
+        "decision_ledger.similarity.rebuild_and_cluster",
+    ],
 }
 
 
@@ -156,6 +167,51 @@ page_js = {
 # ---------------
 # Hook on document methods and events
 
+doc_events = {
+    # Drop cached workload rows for the affected projects
+    "Task": {
+        "on_update": "decision_ledger.workload.on_task_change",
+        "on_trash": "decision_ledger.workload.on_task_change",
+    },
+    "Timesheet": {
+        "on_submit": "decision_ledger.workload.on_timesheet_change",
+        "on_cancel": "decision_ledger.workload.on_timesheet_change",
+    },
+    "ToDo": {
+        "on_update": "decision_ledger.workload.on_todo_change",
+        "on_trash": "decision_ledger.workload.on_todo_change",
+    },
+    # Drop cached per-user allowed-project sets
+    "User Permission": {
+        "on_update": "decision_ledger.project_access.on_user_permission_change",
+        "on_trash": "decision_ledger.project_access.on_user_permission_change",
+    },
+    "DocShare": {
+        "on_update": "decision_ledger.project_access.on_docshare_change",
+        "on_trash": "decision_ledger.project_access.on_docshare_change",
+    },
+    "Project": {
+        "on_update": [
+            "decision_ledger.project_access.on_project_change",
+            "decision_ledger.workload.on_project_change",
+        ],
+        "on_trash": [
+            "decision_ledger.project_access.on_project_change",
+            "decision_ledger.workload.on_project_change",
+        ],
+    },
+    "User": {
+        "on_update": "decision_ledger.project_access.on_user_change",
+    },
+    "Custom DocPerm": {
+        "on_update": "decision_ledger.project_access.on_role_permission_change",
+        "on_trash": "decision_ledger.project_access.on_role_permission_change",
+    },
+    "Role Profile": {
+        "on_update": "decision_ledger.project_access.on_role_permission_change",
+    },
+}
+
 # doc_events = {
 # 	"*": {
 # 		"on_update": "method",
@@ -215,13 +271,13 @@ page_js = {
 
 # Request Events
 # ----------------
-# before_request = ["decision_ledger.utils.before_request"]
-# after_request = ["decision_ledger.utils.after_request"]
+before_request = ["decision_ledger.profiling.before_request"]
+after_request = ["decision_ledger.profiling.after_request", "decision_ledger.replica.close_replica"]
 
 # Job Events
 # ----------
 # before_job = ["decision_ledger.utils.before_job"]
-# after_job = ["decision_ledger.utils.after_job"]
+after_job = ["decision_ledger.replica.close_replica"]
 
 # User Data Protection
 # --------------------
@@ -257,7 +313,7 @@ page_js = {
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
+default_log_clearing_doctypes = {
+    "Decision Ledger Profile": 14,  # days to retain profiles
+}
 
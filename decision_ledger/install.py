@@ -2,6 +2,7 @@ import frappe
 
 def after_install():
     add_decision_link_to_project()
+    add_digest_hour_field()
 
 def add_decision_link_to_project():
     """Add 'Decision' to Project > Connections, linked via Decision.project."""
@@ -34,3 +35,22 @@ def add_decision_link_to_project():
     })
     row.insert(ignore_permissions=True)
     frappe.db.commit()
+
+def add_digest_hour_field():
+    """User.digest_hour: local hour (0-23) for the ToDo digest; read by schedules.digest_shards.
+
+    A Select with a blank first option, so "not set" stays distinguishable from
+    midnight (Int columns are NOT NULL DEFAULT 0).
+    """
+    from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+    create_custom_fields({
+        "User": [{
+            "fieldname": "digest_hour",
+            "label": "ToDo Digest Hour",
+            "fieldtype": "Select",
+            "options": "\n" + "\n".join(str(h) for h in range(24)),
+            "insert_after": "time_zone",
+            "description": "Local hour (0-23) to receive the daily ToDo digest. Leave empty for the default.",
+        }]
+    }, update=True)
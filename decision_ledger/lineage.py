@@ -0,0 +1,74 @@
+import frappe
+from frappe.utils import cint
+
+# Every Decision Ledger row carries `lineage_root` (first decision of its
+# amendment chain), `revision` (0 for the original) and `is_latest_revision`,
+# set by the controller at insert. Both lookups below are single indexed queries.
+
+LIST_FIELDS = ["name", "project", "decision_area", "decision_status", "decision_impact_type",
+               "docstatus", "lineage_root", "revision", "is_latest_revision", "modified"]
+
+
+def get_chain(decision: str):
+    """Full amendment history of `decision`, oldest revision first."""
+    return frappe.db.sql("""
+        SELECT d.name, d.project, d.decision_status, d.docstatus, d.amended_from,
+               d.lineage_root, d.revision, d.is_latest_revision, d.modified
+        FROM `tabDecision Ledger` d
+        JOIN `tabDecision Ledger` src ON src.lineage_root = d.lineage_root
+        WHERE src.name = %s
+        ORDER BY d.revision ASC
+    """, decision, as_dict=True)
+
+
+def get_latest(project: str | None = None, include_cancelled: int = 0, limit: int = 50, start: int = 0):
+    filters = {"is_latest_revision": 1}
+    if project:
+        filters["project"] = project
+    if not cint(include_cancelled):
+        filters["docstatus"] = ["<", 2]
+    return frappe.get_list(
+        "Decision Ledger",
+        filters=filters,
+        fields=LIST_FIELDS,
+        order_by="modified desc",
+        start=cint(start),
+        page_length=cint(limit) or 50,
+    )
+
+
+def rebuild_lineage():
+    """Backfill lineage columns for rows created before the index existed."""
+    parents = {
+        r.name: r.amended_from
+        for r in frappe.db.sql("SELECT name, amended_from FROM `tabDecision Ledger`", as_dict=True)
+    }
+
+    lineage = {}
+    for name in parents:
+        chain, cur = [], name
+        while cur and cur not in lineage and cur not in chain:
+            chain.append(cur)
+            cur = parents.get(cur)
+        if cur in lineage:
+            root, rev = lineage[cur]
+        else:
+            root, rev = chain[-1], -1
+        for node in reversed(chain):
+            rev += 1
+            lineage[node] = (root, rev)
+
+    latest = {}
+    for name, (root, rev) in lineage.items():
+        if rev >= latest.get(root, (None, -1))[1]:
+            latest[root] = (name, rev)
+    latest_names = {name for name, _ in latest.values()}
+
+    for name in parents:
+        root, rev = lineage[name]
+        frappe.db.set_value("Decision Ledger", name, {
+            "lineage_root": root,
+            "revision": rev,
+            "is_latest_revision": 1 if name in latest_names else 0,
+        }, update_modified=False)
+    frappe.db.commit()
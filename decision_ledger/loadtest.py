@@ -0,0 +1,92 @@
+import time
+
+import frappe
+from frappe.utils import add_days, getdate, now, nowdate
+
+from .delivery import FakeRavenBackend, percentile, use_backend
+from .digest_runs import LOAD_TEST_SHARD_PREFIX, run_digest
+
+# Drives the real digest job (`digest_runs.run_digest`: rendering, Digest Run /
+# Digest Delivery bookkeeping, retries) against the in-process FakeRavenBackend,
+# so delivery throughput can be measured without a Raven install. Runs use a
+# LOAD_TEST_SHARD_PREFIX shard, which the resume job never picks up.
+#
+# Synthetic recipients are named after the shard, so their Digest Delivery keys
+# never collide with an earlier run's, and each gets TODO_DUE_OFFSETS ToDos so
+# fetching and rendering do real work. A digest that still renders empty (the
+# todo mode skips any digest with an empty section) is replaced by
+# FALLBACK_TEXT, so every recipient is delivered to. ToDos and run records are
+# removed afterwards, even when interrupted, unless `keep` is set.
+
+# Due-date offsets in days (None = no due date) for each synthetic user's ToDos
+TODO_DUE_OFFSETS = (0, 2, 9, 40, None)
+FALLBACK_TEXT = "*Load test digest*"
+
+
+def run_load_test(users: int = 10000, mode: str = "summary", latency_ms: float = 20,
+                  jitter_ms: float = 5, error_rate: float = 0.01, rate_limit: float = 0,
+                  seed: int | None = None, keep: bool = False) -> dict:
+    shard = f"{LOAD_TEST_SHARD_PREFIX}{frappe.generate_hash(length=8)}"
+    recipients = [f"{shard}-{i:06d}@example.invalid" for i in range(users)]
+    backend = FakeRavenBackend(latency_ms=latency_ms, jitter_ms=jitter_ms,
+                               error_rate=error_rate, rate_limit=rate_limit, seed=seed)
+    try:
+        _seed_todos(recipients)
+        return _run(backend, recipients, mode, shard)
+    finally:
+        if not keep:
+            _cleanup(shard)
+
+
+def _seed_todos(recipients):
+    today, ts = getdate(nowdate()), now()
+    frappe.db.bulk_insert(
+        "ToDo",
+        fields=["name", "creation", "modified", "owner", "modified_by", "status", "priority",
+                "allocated_to", "description", "date"],
+        values=[
+            (frappe.generate_hash(length=12), ts, ts, "Administrator", "Administrator", "Open",
+             "Medium", user, "Load test ToDo", add_days(today, offset) if offset is not None else None)
+            for user in recipients
+            for offset in TODO_DUE_OFFSETS
+        ],
+    )
+    frappe.db.commit()
+
+
+def _run(backend, recipients, mode, shard) -> dict:
+    started = time.monotonic()
+    with use_backend(backend):
+        run = run_digest(mode, recipients, shard=shard, fallback_text=FALLBACK_TEXT)
+    elapsed = time.monotonic() - started
+    run.reload()
+
+    stats = backend.stats
+    lat = stats.latencies
+    report = {
+        "digest_run": run.name,
+        "users": len(recipients),
+        "mode": mode,
+        "elapsed_seconds": round(elapsed, 2),
+        "messages_per_second": round(stats.sent / elapsed, 1) if elapsed else 0,
+        "delivered": run.delivered_count,
+        "skipped": run.skipped_count,
+        "failed": run.failed_count,
+        "latency_ms": {
+            "p50": round(percentile(lat, 50) * 1000, 1),
+            "p95": round(percentile(lat, 95) * 1000, 1),
+            "p99": round(percentile(lat, 99) * 1000, 1),
+            "max": round(max(lat) * 1000, 1) if lat else 0,
+        },
+        **stats.as_dict(),
+    }
+    return report
+
+
+def _cleanup(shard: str):
+    frappe.db.rollback()  # drop a half-written chunk if the run was interrupted
+    frappe.db.delete("ToDo", {"allocated_to": ["like", f"{shard}-%"]})
+    for name in frappe.get_all("Digest Run", filters={"shard": shard}, pluck="name"):
+        frappe.db.delete("Digest Delivery", {"digest_run": name})
+        frappe.delete_doc("Digest Run", name, ignore_permissions=True, force=True)
+    frappe.db.commit()
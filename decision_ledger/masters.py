@@ -0,0 +1,49 @@
+import frappe
+
+# Small, rarely edited lookup tables. Cached per worker process; a version
+# token in Redis lets every worker notice an edit made elsewhere.
+MASTER_DOCTYPES = ("Decision Area", "Decision Status", "Decision Impact Type")
+
+_local_cache = {}
+
+
+def _version_key(doctype: str) -> str:
+    return f"decision_ledger:master_version:{doctype}"
+
+
+def get_master_values(doctype: str) -> list[str]:
+    """Names of all records in a Decision master table, sorted."""
+    if doctype not in MASTER_DOCTYPES:
+        frappe.throw(f"{doctype} is not a Decision master")
+
+    version = frappe.cache().get_value(_version_key(doctype)) or 0
+    key = (frappe.local.site, doctype)
+    cached = _local_cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    values = frappe.get_all(doctype, order_by="name asc", pluck="name")
+    _local_cache[key] = (version, values)
+    return values
+
+
+def get_all_masters() -> dict:
+    return {
+        "areas": get_master_values("Decision Area"),
+        "statuses": get_master_values("Decision Status"),
+        "impact_types": get_master_values("Decision Impact Type"),
+    }
+
+
+def invalidate(doctype: str):
+    """Called from the master controllers on update/rename/delete.
+
+    The version is bumped again after commit so a worker that re-read the table
+    mid-transaction does not keep the stale list.
+    """
+    def _bump():
+        _local_cache.pop((frappe.local.site, doctype), None)
+        frappe.cache().set_value(_version_key(doctype), frappe.generate_hash(length=10))
+
+    _bump()
+    frappe.db.after_commit.add(_bump)
@@ -0,0 +1,5 @@
+from decision_ledger.install import add_digest_hour_field
+
+
+def execute():
+    add_digest_hour_field()
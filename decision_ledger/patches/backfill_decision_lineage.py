@@ -0,0 +1,5 @@
+from decision_ledger.lineage import rebuild_lineage
+
+
+def execute():
+    rebuild_lineage()
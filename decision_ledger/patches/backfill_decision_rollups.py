@@ -0,0 +1,5 @@
+from decision_ledger.analytics import rebuild_rollups
+
+
+def execute():
+    rebuild_rollups()
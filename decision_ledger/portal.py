@@ -0,0 +1,220 @@
+import base64
+import hashlib
+
+import frappe
+from frappe.utils import cint, get_datetime, strip_html_tags
+from frappe.utils.html_utils import sanitize_html
+
+from .project_access import allowed_projects
+
+# Read-only decision log served at /decisions (templates/pages/decisions.py).
+#
+# Rendered fragments are cached in Redis: project pages per (project, cursor),
+# decision pages per name, and the project index as rows filtered per user.
+# Each project has a version token (hash PORTAL_VERSION_KEY, "*" for the index)
+# that is part of every page key and is bumped by the Decision Ledger controller
+# on submit, cancel (which covers amend) and update-after-submit, so stale pages
+# simply stop being addressed and expire after CACHE_TTL.
+#
+# Nothing is cached for input the portal did not produce: project pages only for
+# projects in the (cached) index, later pages only for cursors issued by an
+# earlier page of the same version (PORTAL_CURSORS_KEY), decision pages only for
+# decisions that exist.
+
+PAGE_LENGTH = 20
+CACHE_TTL = 6 * 60 * 60
+BROWSER_MAX_AGE = 60
+PORTAL_VERSION_KEY = "decision_ledger:portal_version"
+PORTAL_CURSORS_KEY = "decision_ledger:portal_cursors"
+INDEX = "*"
+
+
+def portal_user_allowed() -> bool:
+    return frappe.session.user != "Guest" or bool(cint(frappe.conf.get("decision_ledger_portal_allow_guest")))
+
+
+def visible_projects() -> set[str] | None:
+    """Projects the portal visitor may browse, or None for all of them."""
+    if frappe.session.user == "Guest":
+        return None  # only reachable when the site opts in to a public log
+    return allowed_projects()
+
+
+def _version(project: str) -> str:
+    cache = frappe.cache()
+    version = cache.hget(PORTAL_VERSION_KEY, project)
+    if not version:
+        version = frappe.generate_hash(length=8)
+        cache.hset(PORTAL_VERSION_KEY, project, version)
+    return version
+
+
+def _cached(key: str, build):
+    """Cached value of build(); empty results are not stored."""
+    cache = frappe.cache()
+    value = cache.get_value(key)
+    if value is None:
+        value = build()
+        if value:
+            cache.set_value(key, value, expires_in_sec=CACHE_TTL)
+    return value
+
+
+# --- Keyset cursor over (modified, name), newest first ---
+
+def encode_cursor(modified, name: str) -> str:
+    raw = f"{get_datetime(modified).isoformat()}|{name}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        modified, name = raw.split("|", 1)
+        return get_datetime(modified), name
+    except Exception:
+        return None
+
+
+# --- Queries ---
+
+def _project_rows() -> list[dict]:
+    return frappe.db.sql("""
+        SELECT d.project, p.project_name, COUNT(*) AS decisions, MAX(d.modified) AS last_updated
+        FROM `tabDecision Ledger` d
+        LEFT JOIN `tabProject` p ON p.name = d.project
+        WHERE d.docstatus = 1 AND IFNULL(d.project, '') != ''
+        GROUP BY d.project, p.project_name
+        ORDER BY last_updated DESC
+    """, as_dict=True)
+
+
+def _decision_page(project: str, after) -> tuple[list[dict], str | None]:
+    keyset = ""
+    values = {"project": project, "limit": PAGE_LENGTH + 1}
+    if after:
+        keyset = "AND (modified < %(modified)s OR (modified = %(modified)s AND name < %(name)s))"
+        values.update(modified=after[0], name=after[1])
+    rows = frappe.db.sql(f"""
+        SELECT name, decision_area, decision_status, decision_impact_type, proposed_by,
+               revision, modified, description
+        FROM `tabDecision Ledger`
+        WHERE docstatus = 1 AND project = %(project)s {keyset}
+        ORDER BY modified DESC, name DESC
+        LIMIT %(limit)s
+    """, values, as_dict=True)
+
+    next_cursor = None
+    if len(rows) > PAGE_LENGTH:
+        rows = rows[:PAGE_LENGTH]
+        next_cursor = encode_cursor(rows[-1].modified, rows[-1].name)
+    for r in rows:
+        summary = strip_html_tags(r.pop("description") or "").strip()
+        r.summary = summary[:240] + ("…" if len(summary) > 240 else "")
+    return rows, next_cursor
+
+
+# --- Rendering ---
+
+def _render(template: str, context: dict) -> str:
+    return frappe.render_template(f"decision_ledger/templates/includes/decisions/{template}", context)
+
+
+def published_projects() -> dict:
+    """{project: index row} for projects with submitted decisions."""
+    rows = _cached(f"decision_ledger:portal:{_version(INDEX)}:index", _project_rows) or []
+    return {r["project"]: r for r in rows}
+
+
+def render_index(projects: set[str] | None) -> str:
+    rows = list(published_projects().values())
+    if projects is not None:
+        rows = [r for r in rows if r["project"] in projects]
+    return _render("projects.html", {"projects": rows})
+
+
+def render_project(project: str, cursor: str | None = None) -> str | None:
+    """A page of `project`'s decisions, or None when the project has none published."""
+    info = published_projects().get(project)
+    if not info:
+        return None
+
+    version = _version(project)
+    after = decode_cursor(cursor)
+    token = encode_cursor(*after) if after else "first"
+    cache = frappe.cache()
+    cacheable = after is None or cache.hget(PORTAL_CURSORS_KEY, f"{project}:{token}") == version
+
+    def build():
+        rows, next_cursor = _decision_page(project, after)
+        if next_cursor and cacheable:
+            cache.hset(PORTAL_CURSORS_KEY, f"{project}:{next_cursor}", version)
+        return _render("list.html", {
+            "project": project,
+            "project_name": info.get("project_name") or project,
+            "decisions": rows,
+            "next_cursor": next_cursor,
+            "is_first_page": after is None,
+        })
+
+    if not cacheable:
+        return build()
+    return _cached(f"decision_ledger:portal:{project}:{version}:{token}", build)
+
+
+def get_decision(name: str) -> dict | None:
+    """{"project", "html"} for a submitted decision, or None."""
+    def build():
+        doc = frappe.db.get_value(
+            "Decision Ledger", {"name": name, "docstatus": 1},
+            ["name", "project", "decision_area", "decision_status", "decision_impact_type",
+             "proposed_by", "reference", "revision", "modified", "description",
+             "options_considered", "rationale", "impact_details"],
+            as_dict=True,
+        )
+        if not doc or not doc.project:
+            return {}
+        for field in ("description", "options_considered", "rationale", "impact_details"):
+            doc[field] = sanitize_html(doc[field] or "")
+        return {"project": doc.project, "html": _render("detail.html", {"doc": doc})}
+
+    cached = _cached(_decision_key(name), build)
+    return cached or None
+
+
+def _decision_key(name: str) -> str:
+    return f"decision_ledger:portal:decision:{name}"
+
+
+# --- HTTP caching ---
+
+def set_cache_headers(html: str):
+    """Browser/proxy caching for a rendered page. Responses differ per visitor's
+    project scope, so they are private unless the log is public."""
+    headers = getattr(frappe.local, "response_headers", None)
+    if headers is None:
+        return
+    scope = "public" if frappe.session.user == "Guest" else "private"
+    headers["Cache-Control"] = f"{scope}, max-age={BROWSER_MAX_AGE}"
+    headers["ETag"] = '"{}"'.format(hashlib.sha1(html.encode()).hexdigest())
+    headers["Vary"] = "Cookie"
+
+
+# --- Invalidation (Decision Ledger controller) ---
+
+def invalidate(doc):
+    """Retire cached pages for `doc`'s project, the index and the decision itself.
+
+    Repeated after commit so a request that rendered mid-transaction does not keep
+    serving the old page.
+    """
+    def _bump():
+        cache = frappe.cache()
+        for key in {doc.project, INDEX} - {None, ""}:
+            cache.hset(PORTAL_VERSION_KEY, key, frappe.generate_hash(length=8))
+        cache.delete_value(_decision_key(doc.name))
+
+    _bump()
+    frappe.db.after_commit.add(_bump)
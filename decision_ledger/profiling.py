@@ -0,0 +1,283 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint, flt, now_datetime
+
+# Opt-in profiling for scheduler jobs and `decision_ledger.api` calls.
+#
+# Enable for a whole site with `"decision_ledger_profiling": 1` in site_config,
+# or for a single API call with the `X-Decision-Ledger-Profile: 1` header (System
+# Manager only). A profile combines a sampling profiler (collapsed stacks), every
+# SQL statement with its duration and a per-phase breakdown (`phase()` blocks:
+# recipients, fetch, render, deliver). It is stored as a `Decision Ledger
+# Profile` with the full JSON attached as a private file.
+
+PROFILE_HEADER = "X-Decision-Ledger-Profile"
+API_PREFIX = "/api/method/decision_ledger.api."
+DEFAULT_INTERVAL_MS = 5
+MAX_SQL_RECORDS = 5000
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="decision-ledger-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._halt.set()
+        self.join(timeout=1)
+
+
+class Profile:
+    def __init__(self, target: str, kind: str):
+        self.target = target
+        self.kind = kind
+        self.started_at = now_datetime()
+        self.phases = Counter()
+        self.sql = []
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self._phase_stack = []
+        self._start = time.perf_counter()
+        self._sampler = _Sampler(
+            threading.get_ident(),
+            flt(frappe.conf.get("decision_ledger_profiling_interval_ms") or DEFAULT_INTERVAL_MS) / 1000,
+        )
+        self._dbs = []
+
+    # -- lifecycle --
+    def start(self):
+        self._sampler.start()
+        self.wrap_sql(frappe.local.db)
+
+    def stop(self):
+        self.duration = time.perf_counter() - self._start
+        self._sampler.stop()
+        for db in list(self._dbs):
+            self.unwrap_sql(db)
+
+    # -- SQL capture (instance attribute shadows Database.sql while profiling) --
+    def wraps(self, db) -> bool:
+        return any(d is db for d in self._dbs)
+
+    def wrap_sql(self, db, label: str | None = None):
+        original = db.sql
+
+        def sql(query, *args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return original(query, *args, **kwargs)
+            finally:
+                self._record_sql(query, time.perf_counter() - t, label)
+
+        db.sql = sql
+        self._dbs.append(db)
+
+    def unwrap_sql(self, db):
+        if "sql" in db.__dict__:
+            del db.sql
+        self._dbs = [d for d in self._dbs if d is not db]
+
+    def _record_sql(self, query, elapsed: float, label: str | None = None):
+        self.sql_count += 1
+        self.sql_time += elapsed
+        if len(self.sql) < MAX_SQL_RECORDS:
+            record = {"query": " ".join(str(query).split())[:1000], "ms": round(elapsed * 1000, 3)}
+            if label:
+                record["db"] = label
+            self.sql.append(record)
+
+    # -- phases (exclusive time: a nested phase pauses its parent) --
+    def enter_phase(self, name: str):
+        now = time.perf_counter()
+        if self._phase_stack:
+            parent, since = self._phase_stack[-1]
+            self.phases[parent] += now - since
+        self._phase_stack.append((name, now))
+
+    def exit_phase(self):
+        now = time.perf_counter()
+        name, since = self._phase_stack.pop()
+        self.phases[name] += now - since
+        if self._phase_stack:
+            parent, _ = self._phase_stack[-1]
+            self._phase_stack[-1] = (parent, now)
+
+    def summary(self) -> dict:
+        phases = {k: round(v * 1000, 2) for k, v in self.phases.items()}
+        phases["other"] = round(max(self.duration - sum(self.phases.values()), 0) * 1000, 2)
+        return {
+            "target": self.target,
+            "kind": self.kind,
+            "started_at": str(self.started_at),
+            "duration_ms": round(self.duration * 1000, 2),
+            "phases_ms": phases,
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_time * 1000, 2),
+            "samples": sum(self._sampler.stacks.values()),
+        }
+
+    def artifact(self) -> dict:
+        return {
+            **self.summary(),
+            "sql": self.sql,
+            "collapsed_stacks": "\n".join(f"{s} {n}" for s, n in self._sampler.stacks.most_common()),
+        }
+
+
+def _active() -> Profile | None:
+    return getattr(frappe.local, "dl_profile", None)
+
+
+def site_profiling_enabled() -> bool:
+    return bool(cint(frappe.conf.get("decision_ledger_profiling")))
+
+
+@contextmanager
+def phase(name: str):
+    """Attribute the enclosed time to `name` in the active profile (no-op otherwise)."""
+    profile = _active()
+    if profile is None:
+        yield
+        return
+    profile.enter_phase(name)
+    try:
+        yield
+    finally:
+        profile.exit_phase()
+
+
+@contextmanager
+def capture_sql(db, label: str):
+    """Also record SQL run on `db` (e.g. a replica swapped into frappe.local.db)."""
+    profile = _active()
+    if profile is None or profile.wraps(db):
+        yield
+        return
+    profile.wrap_sql(db, label)
+    try:
+        yield
+    finally:
+        profile.unwrap_sql(db)
+
+
+def in_phase(name: str):
+    """Decorator form of `phase()`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _start(target: str, kind: str) -> Profile | None:
+    if _active() is not None:
+        return None  # nested call inside an already profiled job/request
+    profile = Profile(target, kind)
+    frappe.local.dl_profile = profile
+    profile.start()
+    return profile
+
+
+def _finish(profile: Profile | None):
+    if profile is None:
+        return
+    profile.stop()
+    frappe.local.dl_profile = None
+    try:
+        save(profile)
+    except Exception:
+        frappe.log_error(f"Saving profile for {profile.target} failed", "decision-ledger-profiling")
+
+
+def save(profile: Profile):
+    s = profile.summary()
+    doc = frappe.get_doc({
+        "doctype": "Decision Ledger Profile",
+        "target": profile.target,
+        "kind": profile.kind,
+        "user": frappe.session.user,
+        "started_at": profile.started_at,
+        "duration_ms": s["duration_ms"],
+        "sql_count": s["sql_count"],
+        "sql_ms": s["sql_ms"],
+        "samples": s["samples"],
+        "phases": json.dumps(s["phases_ms"], indent=1),
+    }).insert(ignore_permissions=True)
+
+    file = frappe.get_doc({
+        "doctype": "File",
+        "file_name": f"{doc.name}.json",
+        "attached_to_doctype": doc.doctype,
+        "attached_to_name": doc.name,
+        "is_private": 1,
+        "content": json.dumps(profile.artifact(), indent=1, default=str),
+    }).insert(ignore_permissions=True)
+    doc.db_set("artifact", file.file_url)
+    frappe.db.commit()
+    return doc
+
+
+def profiled(target: str):
+    """Profile the wrapped scheduler job when site profiling is on."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not site_profiling_enabled():
+                return fn(*args, **kwargs)
+            profile = _start(target, "Job")
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                # save() commits: drop the failed job's partial writes first
+                frappe.db.rollback()
+                _finish(profile)
+                raise
+            _finish(profile)
+            return result
+        return wrapper
+    return decorator
+
+
+# --- Request hooks for decision_ledger.api endpoints ---
+
+def before_request():
+    request = getattr(frappe.local, "request", None)
+    if request is None or not request.path.startswith(API_PREFIX):
+        return
+    wanted = site_profiling_enabled() or (
+        request.headers.get(PROFILE_HEADER) == "1" and "System Manager" in frappe.get_roles()
+    )
+    if wanted:
+        _start(request.path[len("/api/method/"):], "Request")
+
+
+def after_request(*args, **kwargs):
+    profile = _active()
+    if profile is not None and profile.kind == "Request":
+        _finish(profile)
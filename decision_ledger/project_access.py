@@ -0,0 +1,134 @@
+import time
+
+import frappe
+
+from .replica import on_replica
+
+# Per-user set of readable Projects, so rollup endpoints can scope their SQL
+# instead of calling frappe.has_permission per row.
+#
+# A user with Project read (role) and no User Permissions that apply to Project
+# (on Project itself or on a doctype Project links to, e.g. Company) sees every
+# project (cached as "*"). Otherwise the set is what frappe.get_list returns for
+# them (when they have the role), plus projects shared with them and projects
+# that list them as a Project User. Sets live in a Redis hash keyed by user and
+# are dropped by the User Permission / DocShare / Project / User doc events
+# below; role permission edits (Custom DocPerm, Role Profile) clear every user.
+# Entries also expire after CACHE_TTL_SECONDS to bound anything those events
+# miss. Sets computed inside a replica-routed read are used but not cached, so a
+# lagging replica cannot re-cache access that was just revoked.
+
+CACHE_KEY = "decision_ledger:allowed_projects"
+CACHE_TTL_SECONDS = 10 * 60
+UNRESTRICTED = "*"
+
+
+def _restricting_doctypes() -> set[str]:
+    """Doctypes whose User Permissions can restrict which Projects a user reads."""
+    meta = frappe.get_meta("Project")
+    return {"Project"} | {f.options for f in meta.get_link_fields() if f.options}
+
+
+def _compute(user: str) -> set[str] | None:
+    has_role_read = frappe.has_permission("Project", "read", user=user)
+
+    restricted = frappe.db.sql("""
+        SELECT 1 FROM `tabUser Permission`
+        WHERE user=%(user)s AND allow IN %(doctypes)s
+          AND (apply_to_all_doctypes=1 OR applicable_for='Project')
+        LIMIT 1
+    """, {"user": user, "doctypes": list(_restricting_doctypes())})
+    if has_role_read and not restricted:
+        return None
+
+    allowed = set()
+    if has_role_read:
+        # Applies User Permissions on every link field and includes shares
+        allowed.update(frappe.get_list("Project", pluck="name", user=user, limit_page_length=0))
+    allowed.update(frappe.db.sql("""
+        SELECT share_name FROM `tabDocShare`
+        WHERE share_doctype='Project' AND `read`=1 AND (user=%s OR everyone=1)
+    """, user, pluck="share_name"))
+    allowed.update(frappe.db.sql("""
+        SELECT parent FROM `tabProject User`
+        WHERE parenttype='Project' AND user=%s
+    """, user, pluck="parent"))
+    return allowed
+
+
+def allowed_projects(user: str | None = None) -> set[str] | None:
+    """Projects `user` may read, or None when unrestricted."""
+    user = user or frappe.session.user
+    if user == "Administrator":
+        return None
+    cache = frappe.cache()
+    entry = cache.hget(CACHE_KEY, user)
+    if entry is None or time.time() - entry["at"] > CACHE_TTL_SECONDS:
+        result = _compute(user)
+        entry = {"at": time.time(), "projects": UNRESTRICTED if result is None else sorted(result)}
+        if not on_replica():
+            cache.hset(CACHE_KEY, user, entry)
+    projects = entry["projects"]
+    return None if projects == UNRESTRICTED else set(projects)
+
+
+def filter_projects(projects, user: str | None = None) -> list[str]:
+    allowed = allowed_projects(user)
+    return list(projects) if allowed is None else [p for p in projects if p in allowed]
+
+
+def check_project_access(project: str, user: str | None = None):
+    allowed = allowed_projects(user)
+    if allowed is not None and project not in allowed:
+        frappe.throw(f"Not permitted to access Project {project}", frappe.PermissionError)
+
+
+# --- Invalidation (doc_events) ---
+
+def invalidate(users=None):
+    """Drop cached sets for `users`, or for everyone when users is None.
+
+    Repeated after commit so a read that ran mid-transaction does not re-cache
+    the old set.
+    """
+    users = None if users is None else {u for u in users if u}
+
+    def _drop():
+        cache = frappe.cache()
+        if users is None:
+            cache.delete_value(CACHE_KEY)
+            return
+        for u in users:
+            cache.hdel(CACHE_KEY, u)
+
+    _drop()
+    frappe.db.after_commit.add(_drop)
+
+
+def on_user_permission_change(doc, method=None):
+    if doc.allow in _restricting_doctypes():
+        invalidate([doc.user])
+
+
+def on_docshare_change(doc, method=None):
+    if doc.share_doctype == "Project":
+        invalidate(None if doc.everyone else [doc.user])
+
+
+def on_project_change(doc, method=None):
+    before = doc.get_doc_before_save()
+    users = {r.user for r in doc.get("users") or []}
+    if before:
+        users |= {r.user for r in before.get("users") or []}
+    invalidate(users)
+
+
+def on_user_change(doc, method=None):
+    # Role changes can grant or revoke Project read
+    invalidate([doc.name])
+
+
+def on_role_permission_change(doc, method=None):
+    # Custom DocPerm / Role Profile: Project read may change for any number of users
+    if doc.doctype != "Custom DocPerm" or doc.parent == "Project":
+        invalidate()
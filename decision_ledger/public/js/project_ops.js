@@ -110,6 +110,17 @@ frappe.pages['project-ops'].on_page_load = async function(wrapper) {
         if (v >= 70) return 'qcs-progress warn';
         return 'qcs-progress ok';
       }
+      function forecastClass(p) {
+        const s = p.forecast && p.forecast.status;
+        if (s === 'over_budget') return 'text-danger';
+        if (s === 'at_risk') return 'text-warning';
+        return 'qcs-subtle';
+      }
+      function loadTitle(p, u) {
+        const r = ((p.workload && p.workload.users) || []).find(x => x.user === u);
+        if (!r) return u;
+        return `${u} — ${fmtHours(r.logged)}h logged / ${fmtHours(r.budgeted)}h budgeted, ${r.open_todos} open ToDos`;
+      }
       function topAssignees(arr, n=5) {
         return (arr || []).slice(0, n);
       }
@@ -119,7 +130,7 @@ frappe.pages['project-ops'].on_page_load = async function(wrapper) {
 
       onMounted(fetchData);
 
-      return { loading, rows, displayRows, q, status, sortBy, fetchData, fmtHours, pct, statusPill, initials, budgetClass, topAssignees, openProject };
+      return { loading, rows, displayRows, q, status, sortBy, fetchData, fmtHours, pct, statusPill, initials, budgetClass, forecastClass, loadTitle, topAssignees, openProject };
     },
     template: `
       <div class="mb-4 d-flex gap-2 align-items-end flex-wrap">
@@ -192,16 +203,25 @@ frappe.pages['project-ops'].on_page_load = async function(wrapper) {
                 <div :style="{ width: pct(p.cost.spent, p.cost.budget)+'%' }"></div>
               </div>
               <div class="qcs-subtle small mt-1" v-if="p.cost.budget">Usage: {{ pct(p.cost.spent, p.cost.budget) }}%</div>
+              <div class="qcs-subtle small mt-1" v-if="p.forecast && p.forecast.projected_cost != null">
+                Forecast: AED {{ (p.forecast.projected_cost||0).toLocaleString() }}
+              </div>
+              <div class="small mt-1" :class="forecastClass(p)" v-if="p.forecast && p.forecast.overrun_date && ['at_risk', 'over_budget'].includes(p.forecast.status)">
+                {{ p.forecast.status === 'over_budget' ? 'Over budget since' : 'Overrun by' }} {{ p.forecast.overrun_date }}
+              </div>
             </div>
           </div>
 
           <div class="mt-3">
             <div class="qcs-subtle small mb-1">Assignees</div>
             <div class="qcs-avatars">
-              <div v-for="u in topAssignees(p.assignees, 6)" :key="u" class="qcs-avatar" :title="u">{{ initials(u) }}</div>
+              <div v-for="u in topAssignees(p.assignees, 6)" :key="u" class="qcs-avatar" :title="loadTitle(p, u)">{{ initials(u) }}</div>
               <div v-if="(p.assignees?.length||0) > 6" class="qcs-more">+{{ p.assignees.length - 6 }} more</div>
               <span v-if="!p.assignees || !p.assignees.length" class="text-muted">—</span>
             </div>
+            <div class="qcs-subtle small mt-2" v-if="p.workload && p.workload.budgeted">
+              Team hours: {{ fmtHours(p.workload.logged) }} / {{ fmtHours(p.workload.budgeted) }} budgeted · {{ fmtHours(p.workload.remaining) }} remaining
+            </div>
           </div>
         </div>
       </div>
@@ -1,4 +1,7 @@
+import json
+
 import frappe
+from frappe.utils import cint, now, strip_html_tags
 
 
 def raven_available() -> bool:
@@ -24,3 +27,96 @@ def log_raven_skip(message: str):
     logger = frappe.logger("decision_ledger")
     logger.setLevel("INFO")
     logger.info(message)
+
+
+def bulk_delivery_supported() -> bool:
+    """Whether digest messages may be written with one batched insert.
+
+    Opt-in with site config `decision_ledger_raven_bulk_delivery: 1`. A batched
+    insert bypasses the Raven Message controller: `bulk_insert_messages` fills in
+    `content`, the channel's `last_message_timestamp` / `last_message_details` and
+    a `message_created` event itself, but Raven's push notifications, unread-count
+    events, mention handling and any validation do not run. Even when enabled,
+    fall back to per-doc inserts if another app hooks Raven Message.
+    """
+    if not cint(frappe.conf.get("decision_ledger_raven_bulk_delivery")):
+        return False
+    return "Raven Message" not in (frappe.get_hooks("doc_events") or {})
+
+
+def _message_rows(items, via: str):
+    """(channel, row) per (user, markdown) item, using the field names of each write path."""
+    from frappe.utils import md_to_html
+
+    if via == "channel":
+        from .todo_notifier import _get_or_create_dm_channel
+
+        sender = frappe.db.get_single_value("Raven Settings", "bot_user") or "Administrator"
+        for user, text in items:
+            channel = _get_or_create_dm_channel(user)
+            yield channel, {"channel": channel, "message_type": "Text", "message": text,
+                            "content": text, "owner": sender}
+    else:
+        bot = frappe.get_doc("Raven Bot", "todo-bot")
+        sender = bot.raven_user or "Administrator"
+        for user, text in items:
+            channel = bot.create_direct_message_channel(user)
+            html = md_to_html(text)
+            yield channel, {"channel_id": channel, "message_type": "Text", "text": html,
+                            "content": strip_html_tags(html).strip(), "is_bot_message": 1,
+                            "bot": bot.raven_user, "owner": sender}
+
+
+def bulk_insert_messages(items, via: str = "bot") -> list[str]:
+    """Write one Raven Message per (user, markdown) item with a single batched insert.
+
+    Sets each channel's `last_message_timestamp` / `last_message_details` in one
+    UPDATE and publishes one `message_created` event per channel after commit.
+    See `bulk_delivery_supported` for the controller side effects that are skipped.
+    Returns the message names.
+    """
+    columns = set(frappe.db.get_table_columns("Raven Message"))
+    rows, by_channel = [], {}
+    ts = now()
+    for channel, row in _message_rows(items, via):
+        row.update(name=frappe.generate_hash(length=10), creation=ts, modified=ts,
+                   modified_by=row["owner"])
+        rows.append(row)
+        by_channel.setdefault(channel, []).append(row["name"])
+    if not rows:
+        return []
+
+    fields = [f for f in rows[0] if f in columns]
+    if not {"channel", "channel_id"} & set(fields):
+        raise frappe.ValidationError("Raven Message has no channel column")
+    frappe.db.bulk_insert("Raven Message", fields=fields, values=[[r[f] for f in fields] for r in rows])
+
+    if frappe.db.has_column("Raven Channel", "last_message_timestamp"):
+        assignments, values = ["last_message_timestamp=%s"], [ts]
+        if frappe.db.has_column("Raven Channel", "last_message_details"):
+            latest = {r.get("channel_id") or r.get("channel"): r for r in rows}
+            assignments.append("last_message_details = CASE name {} END".format(
+                " ".join("WHEN %s THEN %s" for _ in latest)))
+            for channel, r in latest.items():
+                values += [channel, json.dumps({
+                    "message_id": r["name"],
+                    "content": r.get("content"),
+                    "message_type": r["message_type"],
+                    "owner": r["owner"],
+                    "is_bot_message": r.get("is_bot_message", 0),
+                    "bot": r.get("bot"),
+                })]
+        frappe.db.sql(f"""
+            UPDATE `tabRaven Channel` SET {", ".join(assignments)} WHERE name IN %s
+        """, (*values, tuple(by_channel)))
+
+    sender = rows[0]["owner"]
+    for channel, names in by_channel.items():
+        frappe.publish_realtime(
+            "message_created",
+            {"channel_id": channel, "sender": sender, "message_id": names[-1], "message_ids": names},
+            doctype="Raven Channel",
+            docname=channel,
+            after_commit=True,
+        )
+    return [r["name"] for r in rows]
@@ -0,0 +1,204 @@
+import functools
+
+import frappe
+from frappe.utils import cint, flt
+
+from .profiling import capture_sql
+
+# Read-replica routing for read-only endpoints.
+#
+# Uses Frappe's standard replica settings (`replica_host`, `replica_db_port`,
+# `different_credentials_for_replica`, `replica_db_name`, `replica_db_password`)
+# plus an app section in site_config:
+#
+#   "decision_ledger_replica": {
+#       "enabled": 1,
+#       "max_lag_seconds": 30,
+#       "check_lag": 1,
+#       "endpoints": {"get_projects_overview": 1, "get_project_detail": 1, "todo_digest": 0}
+#   }
+#
+# Endpoints not listed follow `enabled`. When the replica is unreachable or lags
+# beyond `max_lag_seconds`, calls fall back to the primary; the outcome is cached
+# for LAG_CACHE_SECONDS so a down replica costs one connection attempt per window,
+# not one per call. The lag check needs REPLICATION CLIENT (MariaDB: REPLICA
+# MONITOR) for the replica user; without it lag is unknown and reads stay on the
+# primary. For local testing point `replica_host` at the same server and set
+# `check_lag: 0`, since bench's per-database grants cannot read replication status.
+#
+# frappe.read_only() is not used: it is switched on site-wide by
+# `read_from_replica` and has no lag check or per-endpoint routing.
+
+DEFAULT_MAX_LAG_SECONDS = 30
+LAG_CACHE_SECONDS = 15
+_LAG_CACHE_KEY = "decision_ledger:replica_lag"
+# Cached instead of a lag when the replica could not be reached or checked
+UNAVAILABLE = -1
+# MariaDB/MySQL: SHOW SLAVE STATUS needs REPLICATION CLIENT / REPLICA MONITOR
+_ER_SPECIFIC_ACCESS_DENIED = 1227
+
+
+def _settings() -> dict:
+    return frappe.conf.get("decision_ledger_replica") or {}
+
+
+def endpoint_enabled(endpoint: str) -> bool:
+    settings = _settings()
+    if not cint(settings.get("enabled")) or not frappe.conf.get("replica_host"):
+        return False
+    return bool(cint((settings.get("endpoints") or {}).get(endpoint, 1)))
+
+
+def on_replica() -> bool:
+    """True inside a replica-routed read; results may lag and must not be cached."""
+    return bool(getattr(frappe.local, "dl_on_replica", False))
+
+
+def max_lag_seconds() -> float:
+    return flt(_settings().get("max_lag_seconds") or DEFAULT_MAX_LAG_SECONDS)
+
+
+def _log(message: str):
+    logger = frappe.logger("decision_ledger")
+    logger.setLevel("INFO")
+    logger.info(message)
+
+
+def _connect():
+    from frappe.database import get_db
+
+    conf = frappe.conf
+    user, password = conf.db_name, conf.db_password
+    if conf.different_credentials_for_replica:
+        user, password = conf.replica_db_name, conf.replica_db_password
+    return get_db(host=conf.replica_host, user=user, password=password, port=conf.replica_db_port)
+
+
+def measure_lag(db) -> float | None:
+    """Seconds the replica is behind the primary; None when broken or not readable."""
+    if frappe.conf.db_type == "postgres":
+        lag = db.sql("""
+            SELECT CASE WHEN pg_is_in_recovery()
+                THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                ELSE 0 END
+        """)[0][0]
+        return flt(lag)
+
+    try:
+        status = db.sql("SHOW SLAVE STATUS", as_dict=True)
+    except Exception as e:
+        if not e.args or e.args[0] != _ER_SPECIFIC_ACCESS_DENIED:
+            raise
+        _log("No privilege for SHOW SLAVE STATUS (grant REPLICATION CLIENT, or set check_lag: 0)")
+        return None
+    if not status:
+        return 0.0  # not a replica (e.g. a second local connection standing in)
+    lag = status[0].get("Seconds_Behind_Master")
+    return None if lag is None else flt(lag)
+
+
+def _remember_lag(lag: float):
+    frappe.cache().set_value(_LAG_CACHE_KEY, lag, expires_in_sec=LAG_CACHE_SECONDS)
+
+
+def _usable(lag) -> bool:
+    return lag != UNAVAILABLE and lag <= max_lag_seconds()
+
+
+def _get_replica():
+    """Replica connection for this request/job, or None to stay on the primary."""
+    lag = frappe.cache().get_value(_LAG_CACHE_KEY)
+    if lag is not None and not _usable(lag):
+        return None  # recent failure or lag: don't reconnect until the entry expires
+
+    db = getattr(frappe.local, "dl_replica_db", None)
+    if db is None:
+        try:
+            db = _connect()
+            db.connect()
+        except Exception as e:
+            _log(f"Replica unavailable, reading from primary: {e}")
+            _remember_lag(UNAVAILABLE)
+            return None
+        frappe.local.dl_replica_db = db
+
+    if lag is None:
+        if not cint(_settings().get("check_lag", 1)):
+            lag = 0.0
+        else:
+            try:
+                lag = measure_lag(db)
+            except Exception as e:
+                _log(f"Replica lag check failed, reading from primary: {e}")
+                lag = None
+        lag = UNAVAILABLE if lag is None else lag
+        _remember_lag(lag)
+
+    if not _usable(lag):
+        _log(f"Replica lag {lag}s over {max_lag_seconds()}s or unknown, reading from primary")
+        close_replica()
+        return None
+    return db
+
+
+def replica_read(endpoint: str):
+    """Run the wrapped read-only function against the replica when enabled for `endpoint`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if on_replica() or not endpoint_enabled(endpoint):
+                return fn(*args, **kwargs)
+            replica = _get_replica()
+            if replica is None:
+                return fn(*args, **kwargs)
+
+            primary = frappe.local.db
+            frappe.local.db = replica
+            frappe.local.dl_on_replica = True
+            try:
+                with capture_sql(replica, "replica"):
+                    return fn(*args, **kwargs)
+            finally:
+                frappe.local.db = primary
+                frappe.local.dl_on_replica = False
+        return wrapper
+    return decorator
+
+
+def close_replica(*args, **kwargs):
+    """after_request / after_job hook: drop the replica connection opened for this unit of work."""
+    db = getattr(frappe.local, "dl_replica_db", None)
+    if db is None:
+        return
+    try:
+        db.close()
+    except Exception:
+        pass
+    frappe.local.dl_replica_db = None
+
+
+def replica_status() -> dict:
+    """Configuration, per-endpoint routing and freshly measured lag."""
+    settings = _settings()
+    status = {
+        "configured": bool(frappe.conf.get("replica_host")),
+        "enabled": bool(cint(settings.get("enabled"))),
+        "max_lag_seconds": max_lag_seconds(),
+        "endpoints": {
+            ep: endpoint_enabled(ep)
+            for ep in ("get_projects_overview", "get_project_detail", "todo_digest",
+                       *(settings.get("endpoints") or {}))
+        },
+        "lag_seconds": None,
+        "error": None,
+    }
+    if not status["configured"]:
+        return status
+    try:
+        db = _connect()
+        db.connect()
+        status["lag_seconds"] = measure_lag(db)
+        db.close()
+    except Exception as e:
+        status["error"] = str(e)
+    return status
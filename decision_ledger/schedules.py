@@ -1,25 +1,115 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
 import frappe
-from .todo_bot_tasks import users_with_open_todos, send_summary_to_user, send_full_digest_to_user
-from .raven_utils import raven_available, log_raven_skip
+from frappe.utils import cint, get_system_timezone
+from .todo_bot_tasks import users_with_open_todos
+from .raven_utils import log_raven_skip
+from .delivery import delivery_available
+from .digest_runs import run_digest, resume_incomplete_runs
+from .profiling import in_phase, profiled
+
+# Local hour users get their digest at unless they set User.digest_hour
+DEFAULT_DIGEST_HOUR = 9
+# Local weekday (Monday) on which the full digest replaces the summary
+WEEKLY_FULL_WEEKDAY = 0
+
 
+@profiled("schedules.send_daily_summaries")
 def send_daily_summaries():
-    if not raven_available():
+    if not delivery_available():
         log_raven_skip("Skipping daily ToDo summaries: Raven is not installed")
         return
-    for user in users_with_open_todos():
-        if not user: continue
-        try:
-            send_summary_to_user(user, preview_per_section=2)  # short & sweet
-        except Exception as e:
-            frappe.log_error(f"Daily summary failed for {user}: {e}", "todo-bot")
+    run_digest("summary", users_with_open_todos())
 
+@profiled("schedules.send_weekly_full")
 def send_weekly_full():
-    if not raven_available():
+    if not delivery_available():
         log_raven_skip("Skipping weekly ToDo digest: Raven is not installed")
         return
-    for user in users_with_open_todos():
-        if not user: continue
+    run_digest("full", users_with_open_todos())
+
+
+@in_phase("recipients")
+def digest_shards(now_utc: datetime | None = None) -> dict:
+    """Users whose local clock is in their digest hour right now.
+
+    Returns {(local_date, mode): [users]}. Time zones come from User.time_zone
+    (falling back to the system zone); only the zones currently at some user's
+    digest hour are queried, so each hourly run touches one slice of users.
+    """
+    now_utc = now_utc or datetime.now(timezone.utc)
+    system_tz = get_system_timezone()
+    default_hour = cint(frappe.conf.get("decision_ledger_digest_hour") or DEFAULT_DIGEST_HOUR)
+    has_hour_col = frappe.db.has_column("User", "digest_hour")
+
+    zones = frappe.db.sql("""
+        SELECT DISTINCT IFNULL(NULLIF(u.time_zone, ''), %(system_tz)s) AS tz
+        FROM `tabUser` u
+        WHERE u.enabled=1 AND u.name IN (
+            SELECT td.allocated_to FROM `tabToDo` td WHERE td.status != 'Closed'
+        )
+    """, {"system_tz": system_tz}, pluck="tz")
+
+    local_now = {}
+    for tz in zones:
         try:
-            send_full_digest_to_user(user)
-        except Exception as e:
-            frappe.log_error(f"Weekly full digest failed for {user}: {e}", "todo-bot")
+            local_now[tz] = now_utc.astimezone(ZoneInfo(tz))
+        except Exception:
+            log_raven_skip(f"Skipping digest shard for unknown time zone {tz!r}")
+
+    if not has_hour_col:
+        local_now = {tz: dt for tz, dt in local_now.items() if dt.hour == default_hour}
+    if not local_now:
+        return {}
+
+    # digest_hour is a Select: blank (NULL or '') means the default hour
+    hour_expr = (f"COALESCE(NULLIF(u.digest_hour, ''), '{default_hour}')" if has_hour_col
+                 else f"'{default_hour}'")
+    by_hour = {}
+    for tz, dt in local_now.items():
+        by_hour.setdefault(dt.hour, []).append(tz)
+
+    conditions, params = [], {"system_tz": system_tz}
+    for hour, tzs in by_hour.items():
+        conditions.append(f"({hour_expr} = '{cint(hour)}' AND IFNULL(NULLIF(u.time_zone, ''), %(system_tz)s) IN %(tz_{hour})s)")
+        params[f"tz_{hour}"] = tzs
+
+    rows = frappe.db.sql(f"""
+        SELECT DISTINCT td.allocated_to AS user, IFNULL(NULLIF(u.time_zone, ''), %(system_tz)s) AS tz
+        FROM `tabToDo` td
+        JOIN `tabUser` u ON u.name = td.allocated_to
+        WHERE td.status != 'Closed' AND u.enabled=1
+          AND ({" OR ".join(conditions)})
+    """, params, as_dict=True)
+
+    shards = {}
+    for r in rows:
+        local_date = local_now[r.tz].date()
+        mode = "full" if local_date.weekday() == WEEKLY_FULL_WEEKDAY else "summary"
+        shards.setdefault((local_date, mode), []).append(r.user)
+    return shards
+
+
+@profiled("schedules.dispatch_digests")
+def dispatch_digests():
+    """Hourly: deliver digests to the shard of users now at their local digest hour.
+
+    On the local weekly day the full digest is sent instead of the summary, so no
+    user gets both on the same morning.
+    """
+    if not delivery_available():
+        log_raven_skip("Skipping ToDo digest dispatch: Raven is not installed")
+        return
+    now_utc = datetime.now(timezone.utc)
+    shard = f"utc-{now_utc:%H}"
+    for (local_date, mode), users in digest_shards(now_utc).items():
+        run_digest(mode, users, local_date, shard)
+
+
+@profiled("schedules.resume_digest_runs")
+def resume_digest_runs():
+    """Scheduler: finish digest runs that were interrupted or left retriable failures."""
+    if not delivery_available():
+        return
+    resume_incomplete_runs()
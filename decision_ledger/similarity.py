@@ -0,0 +1,220 @@
+import random
+import re
+import zlib
+
+import frappe
+from frappe.utils import cint, flt, strip_html_tags
+
+# MinHash signature: NUM_PERM 32-bit minimums, split into BANDS bands of ROWS
+# rows for LSH bucketing. Two decisions become candidates when any band matches,
+# which happens with high probability once Jaccard similarity is above
+# ~(1/BANDS) ** (1/ROWS) ≈ 0.5; candidates are then ranked by signature agreement.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.6
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures stored in the index must stay comparable across workers and restarts
+_rng = random.Random(20250818)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def decision_text(doc) -> str:
+    """Plain text the index is built from: description + rationale (HTML stripped)."""
+    parts = [doc.get("description"), doc.get("rationale")]
+    return " ".join(strip_html_tags(p) for p in parts if p)
+
+
+def shingles(text: str) -> set[int]:
+    """Word n-gram shingles hashed to 32 bits. Short texts fall back to single words."""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if not tokens:
+        return set()
+    n = SHINGLE_SIZE if len(tokens) >= SHINGLE_SIZE else 1
+    return {
+        zlib.crc32(" ".join(tokens[i:i + n]).encode())
+        for i in range(len(tokens) - n + 1)
+    }
+
+
+def minhash(text: str) -> list[int] | None:
+    sh = shingles(text)
+    if not sh:
+        return None
+    return [
+        min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in sh)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_keys(signature: list[int]) -> list[str]:
+    """One bucket key per band, e.g. '07:1f3a9c...'; stored in an indexed column."""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS]
+        digest = zlib.crc32(",".join(map(str, chunk)).encode())
+        keys.append(f"{band:02d}:{digest:08x}")
+    return keys
+
+
+def encode_signature(signature: list[int]) -> str:
+    return "".join(f"{v:08x}" for v in signature)
+
+
+def decode_signature(value: str) -> list[int]:
+    return [int(value[i:i + 8], 16) for i in range(0, len(value or ""), 8)]
+
+
+def estimate_similarity(a: list[int], b: list[int]) -> float:
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+# --- Index maintenance ---
+
+def _fingerprint_name(decision: str) -> str | None:
+    # Looked up by the `decision` link, which Frappe keeps current when a
+    # Decision Ledger is renamed (the fingerprint's own name is a hash)
+    return frappe.db.get_value("Decision Fingerprint", {"decision": decision})
+
+
+def update_index(doc):
+    """Upsert the fingerprint for a Decision Ledger doc (called from on_update)."""
+    signature = minhash(decision_text(doc))
+    existing = _fingerprint_name(doc.name)
+    if not signature:
+        if existing:
+            frappe.delete_doc("Decision Fingerprint", existing, ignore_permissions=True)
+        return
+
+    encoded = encode_signature(signature)
+    if existing:
+        fp = frappe.get_doc("Decision Fingerprint", existing)
+        if fp.signature == encoded and fp.project == doc.project:
+            return
+        fp.set("bands", [])
+    else:
+        fp = frappe.new_doc("Decision Fingerprint")
+        fp.decision = doc.name
+
+    fp.project = doc.project
+    fp.signature = encoded
+    for key in band_keys(signature):
+        fp.append("bands", {"band_key": key})
+    fp.save(ignore_permissions=True)
+
+
+def remove_from_index(decision: str):
+    existing = _fingerprint_name(decision)
+    if existing:
+        frappe.delete_doc("Decision Fingerprint", existing, ignore_permissions=True)
+
+
+def find_similar(text: str, top_k: int = 5, exclude: list[str] | None = None,
+                 threshold: float = DUPLICATE_THRESHOLD):
+    """Top-k likely duplicates for `text`.
+
+    Only rows sharing at least one LSH bucket are read back, so the cost scales
+    with the number of candidates rather than with the size of the ledger.
+    """
+    signature = minhash(text)
+    if not signature:
+        return []
+
+    exclude = [e for e in (exclude or []) if e]
+    params = {"keys": band_keys(signature)}
+    exclude_sql = ""
+    if exclude:
+        exclude_sql = "AND fp.decision NOT IN %(exclude)s"
+        params["exclude"] = exclude
+
+    candidates = frappe.db.sql(f"""
+        SELECT fp.decision, fp.project, fp.signature
+        FROM `tabDecision Fingerprint` fp
+        WHERE fp.name IN (
+            SELECT DISTINCT b.parent
+            FROM `tabDecision Fingerprint Band` b
+            WHERE b.band_key IN %(keys)s
+        ) {exclude_sql}
+    """, params, as_dict=True)
+
+    scored = []
+    for c in candidates:
+        score = estimate_similarity(signature, decode_signature(c["signature"]))
+        if score >= threshold:
+            scored.append({"decision": c["decision"], "project": c["project"], "similarity": round(score, 3)})
+
+    scored.sort(key=lambda r: r["similarity"], reverse=True)
+    return scored[:cint(top_k) or 5]
+
+
+def rebuild_index():
+    """Backfill/refresh fingerprints for every non-cancelled decision."""
+    for name in frappe.get_all("Decision Ledger", filters={"docstatus": ["<", 2]}, pluck="name"):
+        try:
+            update_index(frappe.get_doc("Decision Ledger", name))
+        except Exception as e:
+            frappe.log_error(f"Fingerprint failed for {name}: {e}", "decision-similarity")
+    frappe.db.commit()
+
+
+def cluster_duplicates(threshold: float = DUPLICATE_THRESHOLD):
+    """Group the indexed ledger into duplicate clusters.
+
+    Pairs are only compared within shared LSH buckets, then merged with union-find.
+    Returns a list of groups (each a sorted list of decision names, size >= 2).
+    """
+    threshold = flt(threshold) or DUPLICATE_THRESHOLD
+    signatures, decisions = {}, {}
+    for r in frappe.db.sql("SELECT name, decision, signature FROM `tabDecision Fingerprint`", as_dict=True):
+        signatures[r.name] = decode_signature(r.signature)
+        decisions[r.name] = r.decision
+
+    buckets = {}
+    for r in frappe.db.sql("SELECT parent, band_key FROM `tabDecision Fingerprint Band`", as_dict=True):
+        buckets.setdefault(r.band_key, []).append(r.parent)
+
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    compared = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                if estimate_similarity(signatures.get(a), signatures.get(b)) >= threshold:
+                    parent[find(a)] = find(b)
+
+    groups = {}
+    for name in parent:
+        groups.setdefault(find(name), []).append(decisions.get(name, name))
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+
+def rebuild_and_cluster():
+    """Background job: refresh the index, then cache the duplicate groups."""
+    rebuild_index()
+    groups = cluster_duplicates()
+    frappe.cache().set_value("decision_ledger:duplicate_groups", groups)
+    return groups
@@ -0,0 +1,174 @@
+import frappe
+from frappe.utils import add_days, cint, flt, getdate, now, nowdate
+
+# Nightly per-project health snapshots (`Project Health Snapshot`), so trend
+# views read a handful of compact rows instead of replaying Tasks/Timesheets.
+#
+# Retention: Day rows are kept for DAILY_RETENTION_DAYS, then thinned to one row
+# per ISO week (marked Week); Week rows older than WEEKLY_RETENTION_DAYS are
+# thinned to one per month (Month); Month rows are dropped after MAX_RETENTION_DAYS.
+
+DAILY_RETENTION_DAYS = 90
+WEEKLY_RETENTION_DAYS = 730
+MAX_RETENTION_DAYS = 1825
+
+METRICS = ("tasks_total", "tasks_open", "tasks_closed", "hours", "cost", "billed", "budget",
+           "assignee_count")
+
+
+def _collect() -> list[dict]:
+    """Current metrics for every Open project, mirroring get_projects_overview."""
+    rows = {
+        p.name: {"project": p.name, "budget": flt(p.budget)}
+        for p in frappe.db.sql("""
+            SELECT p.name, COALESCE(p.estimated_costing, p.total_costing_amount, 0) AS budget
+            FROM `tabProject` p
+            WHERE p.status = 'Open'
+        """, as_dict=True)
+    }
+    if not rows:
+        return []
+
+    for r in frappe.db.sql("""
+        SELECT t.project,
+               COUNT(*) AS total,
+               SUM(CASE WHEN t.status IN ('Open','Working') THEN 1 ELSE 0 END) AS open_count,
+               SUM(CASE WHEN t.status IN ('Completed','Cancelled') THEN 1 ELSE 0 END) AS closed_count
+        FROM `tabTask` t
+        JOIN `tabProject` p ON p.name = t.project AND p.status = 'Open'
+        GROUP BY t.project
+    """, as_dict=True):
+        rows[r.project].update(tasks_total=cint(r.total), tasks_open=cint(r.open_count),
+                               tasks_closed=cint(r.closed_count))
+
+    for r in frappe.db.sql("""
+        SELECT d.project, SUM(d.hours) AS hours, SUM(d.costing_amount) AS cost,
+               SUM(d.billing_amount) AS billed
+        FROM `tabTimesheet Detail` d
+        JOIN `tabTimesheet` ts ON ts.name = d.parent AND ts.docstatus = 1
+        JOIN `tabProject` p ON p.name = d.project AND p.status = 'Open'
+        GROUP BY d.project
+    """, as_dict=True):
+        rows[r.project].update(hours=flt(r.hours), cost=flt(r.cost), billed=flt(r.billed))
+
+    # Assignees: open ToDos on Tasks plus owners of active Tasks (as on the overview)
+    for r in frappe.db.sql("""
+        SELECT a.project, COUNT(DISTINCT a.user) AS assignees FROM (
+            SELECT t.project, td.allocated_to AS user
+            FROM `tabToDo` td
+            JOIN `tabTask` t ON t.name = td.reference_name
+            WHERE td.reference_type = 'Task' AND td.status != 'Closed'
+              AND IFNULL(td.allocated_to, '') != ''
+            UNION
+            SELECT t.project, t.owner AS user
+            FROM `tabTask` t
+            WHERE t.status IN ('Open','Working') AND IFNULL(t.owner, '') != ''
+        ) a
+        JOIN `tabProject` p ON p.name = a.project AND p.status = 'Open'
+        WHERE a.user NOT IN ('Administrator', 'Guest')
+        GROUP BY a.project
+    """, as_dict=True):
+        rows[r.project]["assignee_count"] = cint(r.assignees)
+
+    return list(rows.values())
+
+
+def take_snapshots(snapshot_date=None):
+    """Nightly job: one Day row per Open project; re-running replaces that day's rows."""
+    snapshot_date = getdate(snapshot_date or nowdate())
+    rows = _collect()
+    frappe.db.delete("Project Health Snapshot", {"snapshot_date": snapshot_date, "granularity": "Day"})
+    if rows:
+        ts, user = now(), frappe.session.user
+        frappe.db.bulk_insert(
+            "Project Health Snapshot",
+            fields=["name", "creation", "modified", "owner", "modified_by",
+                    "project", "snapshot_date", "granularity", *METRICS],
+            values=[
+                (frappe.generate_hash(length=12), ts, ts, user, user,
+                 r["project"], snapshot_date, "Day", *(r.get(m) or 0 for m in METRICS))
+                for r in rows
+            ],
+        )
+    apply_retention(snapshot_date)
+    frappe.db.commit()
+
+
+def _downsample(granularity: str, target: str, older_than, period):
+    """Collapse old `granularity` rows to one `target` row per (project, period).
+
+    Rows already thinned to `target` in earlier runs join their period's group, so
+    a period that ages past the cutoff one day at a time still ends up with a
+    single row: the latest one, relabelled `target`.
+    """
+    fields = ["name", "project", "snapshot_date", "granularity"]
+    old = frappe.get_all(
+        "Project Health Snapshot",
+        filters={"granularity": granularity, "snapshot_date": ["<", older_than]},
+        fields=fields,
+        limit_page_length=0,
+    )
+    if not old:
+        return
+
+    # Earlier target rows that can share a period with the old rows (periods span <= 31 days)
+    since = add_days(min(getdate(r.snapshot_date) for r in old), -31)
+    old += frappe.get_all(
+        "Project Health Snapshot",
+        filters={"granularity": target, "snapshot_date": ["between", [since, add_days(older_than, -1)]],
+                 "project": ["in", list({r.project for r in old})]},
+        fields=fields,
+        limit_page_length=0,
+    )
+
+    _collapse(old, target, period)
+
+
+def _collapse(rows, target: str, period):
+    """Keep the latest row per (project, period) as `target`; delete the others."""
+    groups = {}
+    for r in rows:
+        groups.setdefault((r.project, period(getdate(r.snapshot_date))), []).append(r)
+
+    relabel, drop = [], []
+    for group in groups.values():
+        group.sort(key=lambda r: getdate(r.snapshot_date), reverse=True)
+        if group[0].granularity != target:
+            relabel.append(group[0].name)
+        drop.extend(r.name for r in group[1:])
+
+    if relabel:
+        frappe.db.set_value("Project Health Snapshot", {"name": ["in", relabel]},
+                            "granularity", target, update_modified=False)
+    for i in range(0, len(drop), 1000):
+        frappe.db.delete("Project Health Snapshot", {"name": ["in", drop[i:i + 1000]]})
+
+
+def _week(d):
+    return d.isocalendar()[:2]
+
+
+def _month(d):
+    return (d.year, d.month)
+
+
+def apply_retention(today=None):
+    today = getdate(today or nowdate())
+    _downsample("Day", "Week", add_days(today, -DAILY_RETENTION_DAYS), _week)
+    _downsample("Week", "Month", add_days(today, -WEEKLY_RETENTION_DAYS), _month)
+    frappe.db.delete("Project Health Snapshot",
+                     {"snapshot_date": ["<", add_days(today, -MAX_RETENTION_DAYS)]})
+
+
+def get_trend(project: str, from_date=None, to_date=None, metrics=None):
+    """Snapshot rows for `project` in [from_date, to_date], oldest first."""
+    metrics = [m for m in (metrics or METRICS) if m in METRICS]
+    to_date = getdate(to_date or nowdate())
+    from_date = getdate(from_date or add_days(to_date, -DAILY_RETENTION_DAYS))
+    return frappe.get_all(
+        "Project Health Snapshot",
+        filters={"project": project, "snapshot_date": ["between", [from_date, to_date]]},
+        fields=["snapshot_date", "granularity", *metrics],
+        order_by="snapshot_date asc",
+        limit_page_length=0,
+    )
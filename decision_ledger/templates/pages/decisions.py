@@ -0,0 +1,42 @@
+from urllib.parse import quote
+
+import frappe
+from frappe import _
+from frappe.utils import escape_html
+
+from decision_ledger import portal
+
+no_cache = 1  # pages are cached by decision_ledger.portal, scoped per visitor
+
+
+def get_context(context):
+    if not portal.portal_user_allowed():
+        frappe.throw(_("You need to be logged in to access this page"), frappe.PermissionError)
+
+    args = frappe.form_dict
+    projects = portal.visible_projects()
+    context.parents = [{"route": "/decisions", "title": _("Decisions")}]
+
+    if args.get("decision"):
+        decision = portal.get_decision(args.decision)
+        if not decision or (projects is not None and decision["project"] not in projects):
+            raise frappe.DoesNotExistError
+        context.title = escape_html(args.decision)
+        context.parents.append({"route": f"/decisions?project={quote(decision['project'])}",
+                                "title": escape_html(decision["project"])})
+        context.fragment = decision["html"]
+    elif args.get("project"):
+        if projects is not None and args.project not in projects:
+            raise frappe.DoesNotExistError
+        fragment = portal.render_project(args.project, args.get("after"))
+        if fragment is None:
+            raise frappe.DoesNotExistError
+        context.title = escape_html(args.project)
+        context.fragment = fragment
+    else:
+        context.title = _("Decisions")
+        context.parents = []
+        context.fragment = portal.render_index(projects)
+
+    portal.set_cache_headers(context.fragment)
+    return context
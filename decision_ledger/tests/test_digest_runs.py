@@ -0,0 +1,222 @@
+# Copyright (c) 2026, QCS and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from decision_ledger import delivery, digest_runs
+from decision_ledger.delivery import FakeRavenBackend, RavenBackend, use_backend
+from decision_ledger.digest_runs import idempotency_key, run_digest
+
+DIGEST_DATE = "2026-10-19"
+
+
+class Interrupted(BaseException):
+	"""Stands in for a worker being killed mid-chunk (not caught by run_digest)."""
+
+
+class RecordingBackend(FakeRavenBackend):
+	"""Fake Raven that records who was messaged and can fail chosen users."""
+
+	def __init__(self, fail=(), interrupt_on_batch=None):
+		super().__init__()
+		self.fail = set(fail)
+		self.interrupt_on_batch = interrupt_on_batch
+		self.batch_calls = 0
+		self.received = []
+
+	def send_many(self, items, via="bot"):
+		self.batch_calls += 1
+		if self.batch_calls == self.interrupt_on_batch:
+			raise Interrupted
+		results = {}
+		for user, _text in items:
+			if user in self.fail:
+				results[user] = Exception("permanent failure")
+			else:
+				self.received.append(user)
+				results[user] = None
+		return results
+
+
+class WritingBackend(RavenBackend):
+	"""Raven whose messages are ToDos; `fail` users error after their insert,
+	`abort` users roll back the whole transaction first (as a deadlock does)."""
+
+	def __init__(self, fail=(), abort=()):
+		super().__init__()
+		self.fail = set(fail)
+		self.abort = set(abort)
+
+	def send(self, user, text, via="bot"):
+		frappe.get_doc({"doctype": "ToDo", "description": f"{user}: {text}"}).insert(
+			ignore_permissions=True
+		)
+		if user in self.abort:
+			frappe.db.rollback()
+			raise Exception("deadlock")
+		if user in self.fail:
+			raise Exception("insert failed")
+
+
+def render(user):
+	return f"digest for {user}"
+
+
+class TestDigestRuns(FrappeTestCase):
+	def setUp(self):
+		self.prefix = f"dr-{frappe.generate_hash(length=6)}"
+		self.shard = f"test-{self.prefix}"
+		self.users = [f"{self.prefix}-{i}@example.invalid" for i in range(5)]
+		self.renderer = patch.object(digest_runs, "_renderer", return_value=(render, "bot"))
+		self.renderer.start()
+
+	def tearDown(self):
+		self.renderer.stop()
+		frappe.db.rollback()
+		frappe.db.delete("Digest Delivery", {"user": ["like", f"{self.prefix}-%"]})
+		frappe.db.delete("Digest Run", {"shard": ["like", f"%{self.prefix}"]})
+		frappe.db.delete("ToDo", {"description": ["like", f"{self.prefix}-%"]})
+		frappe.db.commit()
+
+	def run_with(self, backend, shard=None, **kwargs):
+		with use_backend(backend):
+			return run_digest("summary", self.users, DIGEST_DATE, shard or self.shard, **kwargs)
+
+	def delivery(self, user):
+		return frappe.get_doc("Digest Delivery", idempotency_key(user, DIGEST_DATE, "summary"))
+
+	def test_delivers_everyone_once(self):
+		backend = RecordingBackend()
+		run = self.run_with(backend)
+		run.reload()
+		self.assertEqual(run.status, "Completed")
+		self.assertEqual(run.delivered_count, 5)
+		self.assertEqual(sorted(backend.received), self.users)
+		self.assertEqual(self.delivery(self.users[0]).attempts, 1)
+
+	def test_rerun_sends_no_duplicates(self):
+		self.run_with(RecordingBackend())
+		again = RecordingBackend()
+		self.run_with(again)
+		self.assertEqual(again.received, [])
+
+	def test_delivered_key_is_skipped_by_other_shards(self):
+		self.run_with(RecordingBackend())
+		other = RecordingBackend()
+		run = self.run_with(other, shard=f"other-{self.prefix}")
+		self.assertEqual(other.received, [])
+		run.reload()
+		self.assertEqual(run.status, "Completed")
+
+	@patch.object(digest_runs, "CHUNK_SIZE", 2)
+	def test_resume_after_interrupt_mid_run(self):
+		first = RecordingBackend(interrupt_on_batch=2)
+		with self.assertRaises(Interrupted):
+			self.run_with(first)
+		frappe.db.rollback()  # the worker died: the open chunk's writes are lost
+
+		run = frappe.get_doc("Digest Run", {"shard": self.shard})
+		self.assertEqual(run.status, "Running")
+		self.assertEqual(run.checkpoint_user, self.users[1])
+		self.assertEqual(
+			frappe.get_all("Digest Delivery", filters={"digest_run": run.name}, pluck="user",
+				order_by="user asc"),
+			self.users[:2],
+		)
+
+		# A recent heartbeat means another worker may still own the run
+		second = RecordingBackend()
+		self.run_with(second)
+		self.assertEqual(second.received, [])
+
+		frappe.db.set_value("Digest Run", run.name, "modified",
+			add_to_date(now_datetime(), minutes=-(digest_runs.STALE_AFTER_MINUTES + 1)),
+			update_modified=False)
+		frappe.db.commit()
+		third = RecordingBackend()
+		self.run_with(third)
+		self.assertEqual(sorted(third.received), self.users[2:])
+		run.reload()
+		self.assertEqual(run.status, "Completed")
+		self.assertEqual(run.delivered_count, 5)
+
+	def test_failures_are_retried_and_counted(self):
+		bad = self.users[3]
+		run = self.run_with(RecordingBackend(fail=[bad]))
+		run.reload()
+		self.assertEqual(run.status, "Failed")
+		self.assertEqual(run.failed_count, 1)
+		self.assertEqual(self.delivery(bad).attempts, 1)
+
+		retry = RecordingBackend(fail=[bad])
+		self.run_with(retry)
+		self.assertEqual(retry.received, [])  # only the failed user is retried
+		self.assertEqual(self.delivery(bad).attempts, 2)
+
+		last = RecordingBackend()
+		run = self.run_with(last)
+		self.assertEqual(last.received, [bad])
+		delivery = self.delivery(bad)
+		self.assertEqual((delivery.status, delivery.attempts), ("Delivered", 3))
+		run.reload()
+		self.assertEqual(run.status, "Completed")
+
+	def test_gives_up_after_max_attempts(self):
+		bad = self.users[0]
+		for _ in range(digest_runs.MAX_ATTEMPTS):
+			self.run_with(RecordingBackend(fail=[bad]))
+		final = RecordingBackend()
+		self.run_with(final)
+		self.assertEqual(final.received, [])
+		self.assertEqual(self.delivery(bad).attempts, digest_runs.MAX_ATTEMPTS)
+
+	@patch.object(digest_runs, "CHUNK_SIZE", 2)
+	def test_chunks_advance_the_checkpoint(self):
+		backend = RecordingBackend()
+		run = self.run_with(backend)
+		run.reload()
+		self.assertEqual(backend.batch_calls, 3)
+		self.assertEqual(run.checkpoint_user, self.users[-1])
+		self.assertEqual(run.delivered_count, 5)
+
+	def render_nothing(self):
+		self.renderer.stop()
+		self.renderer = patch.object(digest_runs, "_renderer", return_value=(lambda user: None, "bot"))
+		self.renderer.start()
+
+	def test_empty_digest_is_skipped(self):
+		self.render_nothing()
+		backend = RecordingBackend()
+		run = self.run_with(backend)
+		run.reload()
+		self.assertEqual((backend.received, run.skipped_count), ([], 5))
+
+	def test_empty_digest_sends_fallback_text(self):
+		self.render_nothing()
+		backend = RecordingBackend()
+		run = self.run_with(backend, fallback_text="fallback")
+		run.reload()
+		self.assertEqual(sorted(backend.received), self.users)
+		self.assertEqual(run.delivered_count, 5)
+
+	@patch.object(delivery, "bulk_delivery_supported", return_value=False)
+	def test_failed_message_rolls_back_only_itself(self, _bulk):
+		bad = self.users[2]
+		self.run_with(WritingBackend(fail=[bad]))
+		written = frappe.get_all("ToDo", filters={"description": ["like", f"{self.prefix}-%"]},
+			pluck="description")
+		self.assertEqual(sorted(d.split(":")[0] for d in written), [u for u in self.users if u != bad])
+		self.assertEqual(self.delivery(bad).status, "Failed")
+		self.assertEqual(self.delivery(self.users[0]).status, "Delivered")
+
+	@patch.object(delivery, "bulk_delivery_supported", return_value=False)
+	def test_aborted_transaction_fails_the_whole_chunk(self, _bulk):
+		run = self.run_with(WritingBackend(abort=[self.users[2]]))
+		run.reload()
+		self.assertEqual(run.failed_count, 5)
+		self.assertFalse(frappe.get_all("ToDo", filters={"description": ["like", f"{self.prefix}-%"]}))
+		self.assertEqual(self.delivery(self.users[0]).status, "Failed")
@@ -0,0 +1,103 @@
+# Copyright (c) 2026, QCS and Contributors
+# See license.txt
+
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import frappe
+
+from decision_ledger import forecast
+from decision_ledger.forecast import WINDOW_DAYS, forecast_from_rows
+
+TODAY = date(2026, 10, 19)
+
+
+def project(name, budget, days_left=None):
+	end = TODAY + timedelta(days=days_left) if days_left is not None else None
+	return frappe._dict(name=name, budget=budget, expected_end_date=end)
+
+
+def daily(name, cost, days=WINDOW_DAYS, hours=1):
+	"""`cost` per day for the last `days` days, ending today."""
+	return [[name, TODAY - timedelta(days=d), cost, hours] for d in range(days)]
+
+
+class TestForecastFromRows(unittest.TestCase):
+	def forecast(self, projects, series):
+		return forecast_from_rows(projects, series, TODAY)
+
+	def test_burn_rate_and_projection(self):
+		f = self.forecast([project("P", 10000, days_left=10)], daily("P", 50))["P"]
+		self.assertEqual(f["spent"], 50 * WINDOW_DAYS)
+		self.assertEqual(f["burn_rate"], 50)
+		self.assertEqual(f["hours_per_day"], 1)
+		self.assertEqual(f["projected_cost"], 50 * WINDOW_DAYS + 50 * 10)
+		self.assertEqual(f["status"], "on_track")
+
+	def test_on_track_when_budget_outlasts_end_date(self):
+		# 280 spent, 10/day, 720 left -> runs out in 72 days, but the project ends in 30
+		f = self.forecast([project("P", 1000, days_left=30)], daily("P", 10))["P"]
+		self.assertEqual(f["status"], "on_track")
+		self.assertEqual(f["overrun_date"], str(TODAY + timedelta(days=72)))
+
+	def test_at_risk_when_budget_runs_out_before_end(self):
+		f = self.forecast([project("P", 1000, days_left=100)], daily("P", 10))["P"]
+		self.assertEqual(f["status"], "at_risk")
+		self.assertEqual(f["overrun_date"], str(TODAY + timedelta(days=72)))
+
+	def test_over_budget_reports_crossing_day(self):
+		# 100/day against a 1000 budget: cumulative reaches 1000 on the 10th day
+		f = self.forecast([project("P", 1000, days_left=5)], daily("P", 100))["P"]
+		self.assertEqual(f["status"], "over_budget")
+		self.assertEqual(f["overrun_date"], str(TODAY - timedelta(days=WINDOW_DAYS - 10)))
+
+	def test_no_budget_and_no_end_date(self):
+		f = self.forecast([project("P", 0)], daily("P", 10))
+		self.assertEqual(f["P"]["status"], "no_budget")
+		self.assertIsNone(f["P"]["projected_cost"])
+		self.assertIsNone(f["P"]["overrun_date"])
+
+	def test_projects_are_independent(self):
+		f = self.forecast(
+			[project("A", 1000, days_left=5), project("B", 1000, days_left=100), project("C", 500)],
+			daily("A", 100) + daily("B", 10),
+		)
+		self.assertEqual([f[p]["status"] for p in "ABC"], ["over_budget", "at_risk", "on_track"])
+		self.assertEqual(f["C"]["spent"], 0)
+
+	def test_old_activity_counts_as_spent_not_burn(self):
+		old = [["P", TODAY - timedelta(days=WINDOW_DAYS + 10), 500, 5]]
+		f = self.forecast([project("P", 1000, days_left=10)], old)["P"]
+		self.assertEqual(f["spent"], 500)
+		self.assertEqual(f["burn_rate"], 0)
+		self.assertEqual(f["projected_cost"], 500)
+
+
+class TestGetForecasts(unittest.TestCase):
+	def get(self, cached):
+		cache = MagicMock()
+		cache.get_value.return_value = cached
+		with patch.object(frappe, "cache", return_value=cache), \
+				patch.object(forecast, "nowdate", return_value=str(TODAY)), \
+				patch.object(frappe, "enqueue") as enqueue, \
+				patch.object(forecast, "compute_forecasts") as compute:
+			data = forecast.get_forecasts()
+		compute.assert_not_called()
+		return data, enqueue
+
+	def test_fresh_cache_is_served(self):
+		data, enqueue = self.get({"as_of": str(TODAY), "data": {"P": 1}})
+		self.assertEqual(data, {"P": 1})
+		enqueue.assert_not_called()
+
+	def test_stale_cache_is_served_and_refresh_queued(self):
+		data, enqueue = self.get({"as_of": str(TODAY - timedelta(days=1)), "data": {"P": 1}})
+		self.assertEqual(data, {"P": 1})
+		enqueue.assert_called_once()
+		self.assertTrue(enqueue.call_args.kwargs["deduplicate"])
+
+	def test_missing_cache_queues_refresh(self):
+		data, enqueue = self.get(None)
+		self.assertEqual(data, {})
+		enqueue.assert_called_once()
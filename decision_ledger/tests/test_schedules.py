@@ -0,0 +1,67 @@
+# Copyright (c) 2026, QCS and Contributors
+# See license.txt
+
+from datetime import date, datetime, timezone
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from decision_ledger.schedules import digest_shards
+
+TZ = "Asia/Kolkata"  # UTC+05:30, no DST
+
+
+def _user_with_open_todo(email: str, digest_hour: str = ""):
+	if not frappe.db.exists("User", email):
+		frappe.get_doc({
+			"doctype": "User",
+			"email": email,
+			"first_name": email.split("@")[0],
+			"send_welcome_email": 0,
+		}).insert(ignore_permissions=True)
+	values = {"time_zone": TZ}
+	if frappe.db.has_column("User", "digest_hour"):
+		values["digest_hour"] = digest_hour or None
+	frappe.db.set_value("User", email, values)
+	frappe.get_doc({
+		"doctype": "ToDo",
+		"allocated_to": email,
+		"description": "digest shard test",
+	}).insert(ignore_permissions=True)
+
+
+class TestDigestShards(FrappeTestCase):
+	def setUp(self):
+		self.conf_hour = frappe.conf.pop("decision_ledger_digest_hour", None)
+		_user_with_open_todo("shard-default@example.com")
+		_user_with_open_todo("shard-seven@example.com", "7")
+
+	def tearDown(self):
+		frappe.db.rollback()
+		if self.conf_hour is not None:
+			frappe.conf.decision_ledger_digest_hour = self.conf_hour
+
+	def users_at(self, now_utc):
+		return {u for users in digest_shards(now_utc=now_utc).values() for u in users}
+
+	def test_unset_hour_uses_default(self):
+		# 03:45 UTC is 09:15 in Kolkata, a Tuesday
+		shards = digest_shards(now_utc=datetime(2026, 10, 20, 3, 45, tzinfo=timezone.utc))
+		self.assertIn("shard-default@example.com", shards.get((date(2026, 10, 20), "summary"), []))
+		self.assertNotIn("shard-seven@example.com", shards.get((date(2026, 10, 20), "summary"), []))
+
+	def test_unset_hour_is_not_midnight(self):
+		# 18:45 UTC is 00:15 the next day in Kolkata
+		self.assertNotIn("shard-default@example.com",
+			self.users_at(datetime(2026, 10, 19, 18, 45, tzinfo=timezone.utc)))
+
+	def test_explicit_hour(self):
+		# 01:45 UTC is 07:15 in Kolkata
+		users = self.users_at(datetime(2026, 10, 20, 1, 45, tzinfo=timezone.utc))
+		self.assertIn("shard-seven@example.com", users)
+		self.assertNotIn("shard-default@example.com", users)
+
+	def test_full_digest_on_local_monday(self):
+		# 03:45 UTC Monday 2026-10-19 is 09:15 Monday in Kolkata
+		shards = digest_shards(now_utc=datetime(2026, 10, 19, 3, 45, tzinfo=timezone.utc))
+		self.assertIn("shard-default@example.com", shards.get((date(2026, 10, 19), "full"), []))
@@ -0,0 +1,92 @@
+# Copyright (c) 2026, QCS and Contributors
+# See license.txt
+
+from datetime import date, timedelta
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now
+
+from decision_ledger.snapshots import (
+	DAILY_RETENTION_DAYS,
+	MAX_RETENTION_DAYS,
+	WEEKLY_RETENTION_DAYS,
+	apply_retention,
+)
+
+PROJECT = "_Test Snapshot Retention"
+
+
+def insert(snapshot_date, granularity="Day"):
+	ts = now()
+	frappe.db.bulk_insert(
+		"Project Health Snapshot",
+		fields=["name", "creation", "modified", "owner", "modified_by",
+			"project", "snapshot_date", "granularity"],
+		values=[(frappe.generate_hash(length=12), ts, ts, "Administrator", "Administrator",
+			PROJECT, snapshot_date, granularity)],
+	)
+
+
+def rows(granularity):
+	return frappe.get_all(
+		"Project Health Snapshot",
+		filters={"project": PROJECT, "granularity": granularity},
+		pluck="snapshot_date",
+		order_by="snapshot_date asc",
+	)
+
+
+class TestSnapshotRetention(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Project Health Snapshot", {"project": PROJECT})
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_nightly_runs_thin_days_to_one_row_per_week(self):
+		start = date(2026, 1, 5)  # a Monday
+		nights = 200
+		for i in range(nights):
+			insert(start + timedelta(days=i))
+			apply_retention(start + timedelta(days=i))
+
+		today = start + timedelta(days=nights - 1)
+		days = rows("Day")
+		weeks = rows("Week")
+		# Rows older than the cutoff are thinned; the cutoff day itself is kept
+		self.assertEqual(len(days), DAILY_RETENTION_DAYS + 1)
+		self.assertTrue(all(d >= today - timedelta(days=DAILY_RETENTION_DAYS) for d in days))
+
+		iso_weeks = [d.isocalendar()[:2] for d in weeks]
+		self.assertEqual(len(iso_weeks), len(set(iso_weeks)))
+		aged = {(start + timedelta(days=i)).isocalendar()[:2]
+			for i in range(nights - DAILY_RETENTION_DAYS - 1)}
+		self.assertEqual(set(iso_weeks), aged)
+
+	def test_week_keeps_latest_day(self):
+		today = date(2026, 10, 19)
+		monday = today - timedelta(days=DAILY_RETENTION_DAYS + 14)
+		monday -= timedelta(days=monday.weekday())
+		for i in range(7):
+			insert(monday + timedelta(days=i))
+		apply_retention(today)
+		self.assertEqual(rows("Week"), [monday + timedelta(days=6)])
+
+	def test_old_weeks_thin_to_one_row_per_month(self):
+		today = date(2026, 10, 19)
+		first = date(2024, 3, 4)  # older than WEEKLY_RETENTION_DAYS
+		self.assertLess(first + timedelta(weeks=8), today - timedelta(days=WEEKLY_RETENTION_DAYS))
+		insert(date(2024, 3, 1), "Month")
+		for w in range(8):
+			insert(first + timedelta(weeks=w), "Week")
+		apply_retention(today)
+		self.assertEqual(rows("Week"), [])
+		self.assertEqual(rows("Month"), [date(2024, 3, 25), date(2024, 4, 22)])
+
+	def test_rows_past_max_retention_are_dropped(self):
+		today = date(2026, 10, 19)
+		insert(today - timedelta(days=MAX_RETENTION_DAYS + 1), "Month")
+		insert(today - timedelta(days=MAX_RETENTION_DAYS - 1), "Month")
+		apply_retention(today)
+		self.assertEqual(rows("Month"), [today - timedelta(days=MAX_RETENTION_DAYS - 1)])
@@ -1,5 +1,8 @@
 import frappe
 from frappe.utils import getdate, nowdate, add_days, format_datetime
+from .replica import replica_read
+from .workload import get_user_workload
+from .profiling import in_phase, phase
 
 def _range_week(date):
     d = getdate(date)
@@ -17,6 +20,8 @@ def _range_month(date):
     end = add_days(next_first, -1)
     return start, end
 
+@in_phase("fetch")
+@replica_read("todo_digest")
 def fetch_user_todos(user: str):
     """Active ToDos for a user (status != Closed). Order: dated first, undated last."""
     return frappe.get_all(
@@ -67,6 +72,7 @@ def group_todos(user: str):
     }
 
 # --- Full (detailed) markdown you already use ---
+@in_phase("render")
 def format_todo_markdown(user: str):
     g = group_todos(user)
     def _fmt(items):
@@ -96,6 +102,7 @@ def format_todo_markdown(user: str):
     return "\n".join(parts).strip()
 
 # --- NEW: Summary mode (counts, optional previews) ---
+@in_phase("render")
 def format_todo_summary_markdown(user: str, preview_per_section: int = 2):
     g = group_todos(user)
 
@@ -126,6 +133,13 @@ def format_todo_summary_markdown(user: str, preview_per_section: int = 2):
     if c_later: lines.append(f"- **Later:** {c_later}")
     if c_nodue: lines.append(f"- **No Due Date:** {c_nodue}")
 
+    # Hours across Open projects (budgeted on Tasks vs logged on Timesheets)
+    with phase("fetch"):
+        wl = get_user_workload(user)
+    if wl and (wl["budgeted"] or wl["logged"]):
+        lines.append(f"- **Hours:** {wl['logged']:.1f} logged / {wl['budgeted']:.1f} budgeted "
+                     f"({wl['remaining']:.1f} remaining)")
+
     # Optional quick preview (top N per bucket)
     if preview_per_section > 0:
         def sec(title, items): 
@@ -1,8 +1,12 @@
 
 import frappe
 from .todo_digest import format_todo_markdown
-from .raven_utils import raven_available, log_raven_skip
+from .raven_utils import log_raven_skip
+from .delivery import deliver, delivery_available
+from .digest_runs import run_digest
+from .profiling import in_phase, profiled
 
+@in_phase("recipients")
 def _get_users_with_open_todos():
     rows = frappe.db.sql("""
         select distinct allocated_to
@@ -38,6 +42,10 @@ def _get_or_create_dm_channel(user_email: str):
     return ch.name
 
 def _send_dm(user_email: str, markdown: str):
+    deliver(user_email, markdown, via="channel")
+
+def _insert_dm_message(user_email: str, markdown: str):
+    """Raven write path behind `_send_dm` (used by delivery.RavenBackend)."""
     channel = _get_or_create_dm_channel(user_email)
     # Minimal message insert – adjust field names to your Raven build if needed
     frappe.get_doc({
@@ -47,16 +55,21 @@ def _send_dm(user_email: str, markdown: str):
         "message": markdown
     }).insert(ignore_permissions=True)
 
+def render_todo_digest(user_email: str) -> str | None:
+    """The user's ToDo digest markdown, or None when there is nothing worth sending."""
+    md = format_todo_markdown(user_email)
+    if md and "None" not in md:  # optional: skip totally empty digests
+        return md
+    return None
+
+@profiled("todo_notifier.send_daily_todo_digests")
 def send_daily_todo_digests():
-    """Cron: run once a day (05:00 UTC) and DM all users their ToDo digest."""
-    if not raven_available():
+    """Cron: run once a day (05:00 UTC) and DM all users their ToDo digest.
+
+    Recorded as a `Digest Run`; a rerun the same day resumes and skips users
+    already delivered.
+    """
+    if not delivery_available():
         log_raven_skip("Skipping ToDo digests: Raven is not installed")
         return
-    users = _get_users_with_open_todos()
-    for u in users:
-        try:
-            md = format_todo_markdown(u)
-            if md and "None" not in md:  # optional: skip totally empty digests
-                _send_dm(u, md)
-        except Exception as e:
-            frappe.log_error(f"ToDo digest failed for {u}: {e}", "todo_notifier")
+    run_digest("todo", _get_users_with_open_todos())
@@ -0,0 +1,186 @@
+import time
+
+import frappe
+from frappe.utils import flt, cint
+
+from .replica import on_replica
+
+# User x project workload: budgeted hours (Task.custom_budgeted_time), logged
+# hours (submitted Timesheets) and open ToDo counts. Each project's rows are
+# cached in a Redis hash and dropped by the Task/Timesheet/ToDo doc events below,
+# so a request only recomputes projects that changed, in three grouped queries.
+# Per-user totals across Open projects (one lookup per digest recipient) live in
+# a second hash, named after a version token that any of those events, or a
+# Project change, replaces; a build that raced an invalidation therefore writes
+# to a hash nobody reads any more. Invalidation is repeated after commit, both
+# caches expire after CACHE_TTL_SECONDS, and nothing computed on the read
+# replica is cached.
+
+CACHE_KEY = "decision_ledger:workload"
+USER_CACHE_KEY = "decision_ledger:workload_users"
+USER_VERSION_KEY = "decision_ledger:workload_users_version"
+CACHE_TTL_SECONDS = 60 * 60
+# Field in the user hash marking it as complete, so a user with no rows is a
+# cache hit rather than a rebuild
+_BUILT = "__built__"
+
+
+def _budget_child_doctype() -> str | None:
+    field = frappe.get_meta("Task").get_field("custom_budgeted_time")
+    return field.options if field and field.fieldtype == "Table" else None
+
+
+def _compute(projects: list[str]) -> dict:
+    """{project: {user: row}} for the given projects."""
+    out = {p: {} for p in projects}
+    if not projects:
+        return out
+
+    def row(project, user):
+        return out[project].setdefault(user, {
+            "user": user, "budgeted": 0.0, "logged": 0.0, "remaining": 0.0, "open_todos": 0
+        })
+
+    child = _budget_child_doctype()
+    if child:
+        for r in frappe.db.sql(f"""
+            SELECT t.project, b.team_member AS user, SUM(b.budgeted_hours) AS hours
+            FROM `tab{child}` b
+            JOIN `tabTask` t ON t.name = b.parent AND b.parenttype = 'Task'
+            WHERE t.project IN %(projects)s AND IFNULL(b.team_member, '') != ''
+            GROUP BY t.project, b.team_member
+        """, {"projects": projects}, as_dict=True):
+            row(r.project, r.user)["budgeted"] = flt(r.hours)
+
+    ts_user = "COALESCE(NULLIF(ts.user, ''), ts.owner)" if frappe.db.has_column("Timesheet", "user") else "ts.owner"
+    for r in frappe.db.sql(f"""
+        SELECT d.project, {ts_user} AS user, SUM(d.hours) AS hours
+        FROM `tabTimesheet Detail` d
+        JOIN `tabTimesheet` ts ON ts.name = d.parent AND ts.docstatus = 1
+        WHERE d.project IN %(projects)s
+        GROUP BY d.project, {ts_user}
+    """, {"projects": projects}, as_dict=True):
+        row(r.project, r.user)["logged"] = flt(r.hours)
+
+    for r in frappe.db.sql("""
+        SELECT t.project, td.allocated_to AS user, COUNT(*) AS open_todos
+        FROM `tabToDo` td
+        JOIN `tabTask` t ON t.name = td.reference_name
+        WHERE td.reference_type = 'Task' AND td.status NOT IN ('Closed', 'Cancelled')
+          AND t.project IN %(projects)s AND IFNULL(td.allocated_to, '') != ''
+        GROUP BY t.project, td.allocated_to
+    """, {"projects": projects}, as_dict=True):
+        row(r.project, r.user)["open_todos"] = cint(r.open_todos)
+
+    for users in out.values():
+        for r in users.values():
+            r["remaining"] = max(r["budgeted"] - r["logged"], 0.0)
+    return out
+
+
+def get_matrix(projects: list[str] | None = None) -> dict:
+    """{project: {user: row}}; defaults to all Open projects."""
+    if projects is None:
+        projects = frappe.get_all("Project", filters={"status": "Open"}, pluck="name")
+    cache = frappe.cache()
+    matrix, missing = {}, []
+    for p in projects:
+        entry = cache.hget(CACHE_KEY, p)
+        if entry is None or time.time() - entry["at"] > CACHE_TTL_SECONDS:
+            missing.append(p)
+        else:
+            matrix[p] = entry["users"]
+    fill = not on_replica()
+    for p, users in _compute(missing).items():
+        if fill:
+            cache.hset(CACHE_KEY, p, {"at": time.time(), "users": users})
+        matrix[p] = users
+    return matrix
+
+
+def project_totals(users: dict) -> dict:
+    return {
+        "budgeted": round(sum(r["budgeted"] for r in users.values()), 2),
+        "logged": round(sum(r["logged"] for r in users.values()), 2),
+        "remaining": round(sum(r["remaining"] for r in users.values()), 2),
+        "open_todos": sum(r["open_todos"] for r in users.values()),
+    }
+
+
+def user_totals(matrix: dict) -> dict:
+    """Collapse the matrix to one row per user across projects."""
+    totals = {}
+    for users in matrix.values():
+        for user, r in users.items():
+            t = totals.setdefault(user, {"user": user, "budgeted": 0.0, "logged": 0.0,
+                                         "remaining": 0.0, "open_todos": 0, "projects": 0})
+            for k in ("budgeted", "logged", "remaining", "open_todos"):
+                t[k] += r[k]
+            t["projects"] += 1
+    return totals
+
+
+def _user_hash(cache) -> str:
+    version = cache.get_value(USER_VERSION_KEY)
+    if not version:
+        version = frappe.generate_hash(length=8)
+        cache.set_value(USER_VERSION_KEY, version)
+    return f"{USER_CACHE_KEY}:{version}"
+
+
+def get_user_workload(user: str) -> dict | None:
+    """`user`'s totals across Open projects; usually two Redis lookups."""
+    cache = frappe.cache()
+    key = _user_hash(cache)
+    row = cache.hget(key, user)
+    if row is None and not cache.hget(key, _BUILT):
+        totals = user_totals(get_matrix())
+        if not on_replica():
+            for u, t in totals.items():
+                cache.hset(key, u, t)
+            cache.hset(key, _BUILT, 1)
+            cache.expire(cache.make_key(key), CACHE_TTL_SECONDS)
+        row = totals.get(user)
+    return row or None
+
+
+# --- Invalidation (doc_events) ---
+
+def invalidate_projects(projects):
+    """Drop cached rows for `projects` and retire the user totals.
+
+    Repeated after commit so a read that ran mid-transaction does not cache the
+    old rows until they expire.
+    """
+    projects = {p for p in projects or [] if p}
+    if not projects:
+        return
+
+    def _drop():
+        cache = frappe.cache()
+        for p in projects:
+            cache.hdel(CACHE_KEY, p)
+        cache.delete_value(_user_hash(cache))
+        cache.set_value(USER_VERSION_KEY, frappe.generate_hash(length=8))
+
+    _drop()
+    frappe.db.after_commit.add(_drop)
+
+
+def on_task_change(doc, method=None):
+    before = doc.get_doc_before_save()
+    invalidate_projects([doc.project, before.project if before else None])
+
+
+def on_timesheet_change(doc, method=None):
+    invalidate_projects([d.project for d in doc.get("time_logs") or []])
+
+
+def on_project_change(doc, method=None):
+    # Opening/closing a project changes which projects the user totals cover
+    invalidate_projects([doc.name])
+
+
+def on_todo_change(doc, method=None):
+    if doc.reference_type == "Task" and doc.reference_name:
+        invalidate_projects([frappe.db.get_value("Task", doc.reference_name, "project")])